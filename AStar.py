@@ -0,0 +1,194 @@
+import math
+from Dijkstra import dijkstra
+from PriorityQueues import make_queue
+from SearchTracer import SearchStats
+from ShortestDistanceCity import build_city_graph, CITY_COORDINATES
+from ShortestPath import build_path, reverse_index, shortest_path
+
+# #########################
+#
+#  A* search
+#
+# #########################
+# A* is Dijkstra ordered by distance-so-far + an estimate of the distance left.
+# If the estimate never overestimates (is admissible), the first time the
+# target is popped its distance is the shortest one, and far fewer nodes are
+# settled than with an uninformed search.
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def haversine(a, b, radius=EARTH_RADIUS_MILES):
+    """Great-circle distance between two (latitude, longitude) points in degrees."""
+    lat1, lon1 = map(math.radians, a)
+    lat2, lon2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * radius * math.asin(min(1.0, math.sqrt(h)))
+
+
+def euclidean(a, b):
+    """Straight-line distance between two (x, y) points."""
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+METRICS = {
+    "haversine": haversine,
+    "euclidean": euclidean,
+}
+
+
+def coordinate_heuristic(coords, target, metric="haversine", scale=1.0):
+    """Return h(node) = scale * metric(coords[node], coords[target]).
+
+    `scale` converts coordinate distance to edge-weight units; keep it small
+    enough that h never exceeds the real route length. Nodes without
+    coordinates get 0.
+    """
+    measure = METRICS[metric] if isinstance(metric, str) else metric
+    goal = coords[target]
+
+    def heuristic(node):
+        point = coords.get(node)
+        return 0 if point is None else scale * measure(point, goal)
+    return heuristic
+
+
+# #########################
+#
+#  ALT heuristic (A*, Landmarks, Triangle inequality)
+#
+# #########################
+class Landmarks:
+    """Precomputed distances to and from a few landmark nodes.
+
+    For any landmark L the triangle inequality gives two lower bounds on d(v, t):
+        d(L, t) - d(L, v)   and   d(v, L) - d(t, L)
+    and the heuristic is the largest bound over all landmarks.
+    """
+
+    def __init__(self, graph, landmarks=None, count=4, reverse=None):
+        if reverse is None:
+            reverse = reverse_index(graph)
+        if landmarks is None:
+            landmarks = self.select(graph, count)
+        self.landmarks = list(landmarks)
+        # from_landmark[L][v] = d(L, v), to_landmark[L][v] = d(v, L)
+        self.from_landmark = {L: dijkstra(graph, L)[0] for L in self.landmarks}
+        self.to_landmark = {L: dijkstra(reverse, L)[0] for L in self.landmarks}
+
+    @staticmethod
+    def select(graph, count):
+        """Pick landmarks far apart: each new one is the node farthest from those already chosen."""
+        nodes = list(graph.nodes)
+        if not nodes:
+            return []
+        # Start from an arbitrary node; the first landmark is the node farthest from it
+        nearest = dijkstra(graph, nodes[0])[0]  # Distance from the closest chosen landmark
+        chosen = []
+        while len(chosen) < count:
+            candidates = [v for v in nearest if v not in chosen]
+            if not candidates:
+                break
+            far = max(candidates, key=nearest.get)
+            reach = dijkstra(graph, far)[0]
+            if not chosen:
+                nearest = dict(reach)
+            else:
+                for v, d in reach.items():
+                    if d < nearest.get(v, math.inf):
+                        nearest[v] = d
+            chosen.append(far)
+        return chosen
+
+    def heuristic(self, target):
+        """Return the ALT lower bound h(node) for routes ending at `target`."""
+        bounds = []
+        for L in self.landmarks:
+            d_from, d_to = self.from_landmark[L], self.to_landmark[L]
+            bounds.append((d_from, d_from.get(target), d_to, d_to.get(target)))
+
+        def heuristic(node):
+            best = 0
+            for d_from, from_target, d_to, to_target in bounds:
+                if from_target is not None and node in d_from:
+                    best = max(best, from_target - d_from[node])
+                if to_target is not None and node in d_to:
+                    best = max(best, d_to[node] - to_target)
+            return best
+        return heuristic
+
+
+def astar(graph, source, target, heuristic=None, coords=None, metric="haversine", scale=1.0,
+          queue="heap", tracer=None):
+    """Return (distance, [source, ..., target]) using A*, or (math.inf, []) if there is no route.
+
+    `heuristic` is a callable node -> estimated distance to `target` (for
+    example Landmarks(graph).heuristic(target)). Alternatively pass a `coords`
+    table and a `metric` to build one with coordinate_heuristic. Without either,
+    this is plain Dijkstra with early termination.
+    """
+    if heuristic is None:
+        if coords is None:
+            return shortest_path(graph, source, target, queue=queue, tracer=tracer)
+        heuristic = coordinate_heuristic(coords, target, metric, scale)
+
+    dist = {source: 0}
+    pred = {}
+    estimate = {}  # Cached h(node), each node is estimated once
+    pq = make_queue(queue)
+    estimate[source] = heuristic(source)
+    pq.push(source, estimate[source])
+    if tracer is not None:
+        tracer.on_start(source, dist, pred)
+        tracer.on_push(source, estimate[source])
+
+    found = False
+    while pq:
+        u, priority = pq.pop()
+        d = dist[u]
+        if tracer is not None:
+            tracer.on_pop(u, priority)
+            tracer.on_settle(u, d)
+        if u == target:
+            found = True
+            break
+        for v, distance in graph.neighbors(u):
+            weight = d + distance
+            # A node is re-queued if a shorter route to it turns up later (inconsistent h)
+            if v not in dist or weight < dist[v]:
+                if tracer is not None:
+                    tracer.on_relax(u, v, dist.get(v), weight)
+                dist[v] = weight
+                pred[v] = u
+                if v not in estimate:
+                    estimate[v] = heuristic(v)
+                pq.push(v, weight + estimate[v])
+                if tracer is not None:
+                    tracer.on_push(v, weight + estimate[v])
+            elif tracer is not None:
+                tracer.on_skip(u, v, dist[v])
+
+    if tracer is not None:
+        tracer.on_finish()
+    if not found:
+        return math.inf, []
+    return dist[target], build_path(pred, source, target)
+
+
+def main():
+    """Compare Dijkstra, great-circle A* and ALT on a city-to-city query."""
+    g = build_city_graph()
+    landmarks = Landmarks(g, count=3)
+    runs = [
+        ("Dijkstra", {}),
+        ("A* (haversine)", {"coords": CITY_COORDINATES}),
+        (f"ALT {landmarks.landmarks}", {"heuristic": landmarks.heuristic('Boston')}),
+    ]
+    for name, options in runs:
+        stats = SearchStats()
+        distance, path = astar(g, 'Seattle', 'Boston', tracer=stats, **options)
+        print(f"{name}: Seattle to Boston = {distance} via {' to '.join(path)} ({stats.settled} nodes settled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,33 @@
-from requests_html import HTMLSession  # Importing HTMLSession from requests_html to scrape webpage content
-from wordcloud import WordCloud, STOPWORDS  # Importing WordCloud for generating word clouds and STOPWORDS for excluding common words
-import matplotlib.pyplot as plt  # Importing matplotlib for visualizing the word cloud
-import matplotlib.colors as mcolors  # Importing mcolors for defining custom colormap
+# requests_html, wordcloud and matplotlib are imported inside the functions that
+# need them, so the tree code can be imported without the scraping/plotting stack
+import hashlib  # Importing hashlib for content-hash cache keys
+import json  # Importing json for the on-disk frequency cache
+import os  # Importing os for walking input directories
+import re  # Importing re for the tokenizer
+import sys  # Importing sys for the command-line source
+from collections import Counter  # Importing Counter for word counting
 import random  # Importing random for shuffling word list
+import time  # Importing time for the lookup benchmark
+from bisect import bisect_left  # Importing bisect_left for the weight-balanced split
 
-# Define a custom colormap for the word cloud visualization
-# Colors are chosen to match a custom palette that will be applied to the word cloud
-custom_cmap = mcolors.ListedColormap(['#E06C4E', '#E64D4D', '#E8B88C', '#499B8A', '#318887'])
+# Define a custom palette for the word cloud visualization
+# The colormap itself is built in show_word_cloud, once matplotlib is imported
+CUSTOM_COLORS = ['#E06C4E', '#E64D4D', '#E8B88C', '#499B8A', '#318887']
+
+# Words are runs of letters, optionally with inner apostrophes ("don't")
+WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)*")
+# Bump when the tokenizer changes, so cached tables computed by the old one are not reused
+TOKENIZER_VERSION = 1
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "bstvsobst")
 
 # Function to compute the cost of the Optimal Binary Search Tree (OBST)
 # Uses dynamic programming to calculate the minimum cost of searching in an optimal BST
 # Reference: https://www.geeksforgeeks.org/optimal-binary-search-tree-dp-24/
-def optimal_bst(freq, n):
+def optimal_bst(freq, n, knuth=False):
+    # Knuth's speed-up gives the same cost in O(n^2) instead of O(n^3)
+    if knuth:
+        return optimal_bst_table(freq, n)[0]
+
     # Initialize a 2D list to store the cost of optimal BSTs for subarrays
     cost = [[0 for x in range(n)] for y in range(n)]
     sum_freq = [0] * n  # List to store the cumulative frequency sum for efficient calculation
@@ -29,30 +45,288 @@ def optimal_bst(freq, n):
                 cost[i][j] = freq[i]  # Cost of a single node is just its frequency
             else:
                 cost[i][j] = float('inf')  # Initialize the cost as infinity for comparison
+                # Every node of the subarray moves one level down, whichever root is chosen
+                weight = sum_freq[j] - (sum_freq[i-1] if i > 0 else 0)
                 for r in range(i, j+1):  # Iterate over all possible root nodes in the range
                     left_cost = cost[i][r-1] if r > i else 0  # Cost of the left subtree
                     right_cost = cost[r+1][j] if r < j else 0  # Cost of the right subtree
                     # Calculate the cost of choosing r as root
-                    cost[i][j] = min(cost[i][j], left_cost + right_cost + sum_freq[j] - (sum_freq[i-1] if i > 0 else 0))
+                    cost[i][j] = min(cost[i][j], left_cost + right_cost + weight)
     
     # Return the minimum cost of the OBST for the entire range
     return cost[0][n-1]
 
-# Function to build a regular Binary Search Tree (BST) and compute its traversal cost
-# It calculates the cost of accessing all nodes in the BST in an ordered fashion
-def regular_bst_cost(words, frequencies):
-    cost = 0  # Initialize traversal cost
-    words_sorted = sorted(zip(words, frequencies), key=lambda x: x[0])  # Sort words alphabetically
-    level = 1  # Starting level of the tree (root node)
-    
-    # For each word, calculate its contribution to the cost based on its level in the tree
-    for word, freq in words_sorted:
-        cost += level * freq  # Multiply frequency by the level (depth) of the node
-        level += 1  # Increment the level for the next word in the sorted list
-    return cost
+# Function to compute the OBST cost and root table with Knuth's optimization
+# The best root of keys i..j always lies between the best roots of i..j-1 and
+# i+1..j, so each subarray only tries the roots in that window. The windows
+# along one diagonal overlap by a single key, which makes the DP O(n^2) overall.
+# Tables are half-open: cost[i][j] and root[i][j] describe keys i..j-1, and
+# cost[i][i] = 0 is the empty tree, so no boundary checks are needed.
+def optimal_bst_table(freq, n=None, use_numpy=False):
+    if n is None:
+        n = len(freq)
+    if use_numpy:
+        try:
+            import numpy as np  # Optional, imported only when asked for (it is slow to import)
+        except ImportError:
+            raise ImportError("optimal_bst_table(use_numpy=True) requires NumPy") from None
+        return _optimal_bst_numpy(freq, n, np)
+
+    prefix = [0] * (n + 1)  # prefix[j] = freq[0] + ... + freq[j-1]
+    for i in range(n):
+        prefix[i + 1] = prefix[i] + freq[i]
+    cost = [[0] * (n + 1) for _ in range(n + 1)]
+    root = [[0] * (n + 1) for _ in range(n + 1)]
+    for i in range(n):
+        cost[i][i + 1] = freq[i]
+        root[i][i + 1] = i
+
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length
+            cost_i = cost[i]
+            best, best_root = float('inf'), i
+            for r in range(root[i][j - 1], root[i + 1][j] + 1):  # Knuth's window
+                candidate = cost_i[r] + cost[r + 1][j]
+                if candidate < best:
+                    best, best_root = candidate, r
+            cost_i[j] = best + prefix[j] - prefix[i]
+            root[i][j] = best_root
+    return (cost[0][n] if n else 0), root
+
+# NumPy version of optimal_bst_table: float64 / int32 tables instead of lists of
+# Python numbers, and each diagonal (all subarrays of one length) is solved at
+# once by laying the root windows end to end and reducing them segment by segment
+def _optimal_bst_numpy(freq, n, np):
+    freq = np.asarray(freq[:n], dtype=np.float64)
+    prefix = np.concatenate(([0.0], np.cumsum(freq)))
+    cost = np.zeros((n + 1, n + 1), dtype=np.float64)
+    root = np.zeros((n + 1, n + 1), dtype=np.int32)
+    starts = np.arange(n)
+    cost[starts, starts + 1] = freq
+    root[starts, starts + 1] = starts
+
+    for length in range(2, n + 1):
+        i = np.arange(n - length + 1)
+        j = i + length
+        low = root[i, j - 1]
+        counts = root[i + 1, j] - low + 1
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        total = int(counts.sum())
+        # r runs over every window in turn; ii / jj say which subarray it belongs to
+        r = np.repeat(low - offsets, counts) + np.arange(total)
+        ii = np.repeat(i, counts)
+        candidates = cost[ii, r] + cost[r + 1, ii + length]
+        best = np.minimum.reduceat(candidates, offsets)
+        # First position of each window's minimum (same tie-break as the list version)
+        position = np.where(candidates == np.repeat(best, counts), np.arange(total), total)
+        first = np.minimum.reduceat(position, offsets)
+        cost[i, j] = best + prefix[j] - prefix[i]
+        root[i, j] = r[first]
+    return (float(cost[0, n]) if n else 0.0), root
+
+# Tree node shared by every search tree below; __slots__ keeps each node to a
+# few pointers instead of a per-instance dictionary
+class BSTNode:
+    __slots__ = ("key", "weight", "left", "right")
+
+    def __init__(self, key, weight=0):
+        self.key = key
+        self.weight = weight
+        self.left = None
+        self.right = None
+
+# Function to build a regular BST by inserting the words in the given order
+# (the shuffled order in compare_trees), without any rebalancing
+def build_regular_bst(words, frequencies):
+    root = None
+    for word, freq in zip(words, frequencies):
+        node = BSTNode(word, freq)
+        if root is None:
+            root = node
+            continue
+        current = root
+        while True:
+            if word == current.key:
+                current.weight += freq  # Duplicate word: merge the weights
+                break
+            side = "left" if word < current.key else "right"
+            child = getattr(current, side)
+            if child is None:
+                setattr(current, side, node)
+                break
+            current = child
+    return root
+
+# Function to build the optimal BST from the root table of optimal_bst_table
+# `keys` must be sorted, with `frequencies` in the same order
+def build_optimal_bst(keys, frequencies):
+    _, root_table = optimal_bst_table(frequencies, len(keys))
+    return _build_from_roots(keys, frequencies, lambda i, j: int(root_table[i][j]))
+
+# Function to build a weight-balanced BST (Mehlhorn's heuristic)
+# The root of each range is the key at which the running weight crosses half of
+# the range's total, found by binary search on the prefix sums: O(n log n), and
+# the expected search cost is within a small additive term of the optimum
+def build_weight_balanced_bst(keys, frequencies):
+    prefix = [0]
+    for freq in frequencies:
+        prefix.append(prefix[-1] + freq)
+
+    def split(i, j):
+        # The middle of key r spans prefix[r]..prefix[r+1]; pick the key whose span holds the halfway mark
+        half = (prefix[i] + prefix[j]) / 2
+        r = bisect_left(prefix, half, i + 1, j + 1) - 1
+        # The key just after may sit closer to the halfway mark
+        if r + 1 < j and abs(prefix[r + 1] + prefix[r + 2] - 2 * half) < abs(prefix[r] + prefix[r + 1] - 2 * half):
+            r += 1
+        return r
+    return _build_from_roots(keys, frequencies, split)
+
+# Helper that builds the subtree of keys i..j-1 rooted at choose_root(i, j), iteratively
+def _build_from_roots(keys, frequencies, choose_root):
+    if not keys:
+        return None
+    top = BSTNode(None)  # Placeholder parent of the real root
+    stack = [(0, len(keys), top, "left")]
+    while stack:
+        i, j, parent, side = stack.pop()
+        if i >= j:
+            continue
+        r = choose_root(i, j)
+        node = BSTNode(keys[r], frequencies[r])
+        setattr(parent, side, node)
+        stack.append((i, r, node, "left"))
+        stack.append((r + 1, j, node, "right"))
+    return top.left
+
+# Function to look up a key; returns the node (or None) and the number of key comparisons
+def bst_search(root, key):
+    comparisons = 0
+    node = root
+    while node is not None:
+        comparisons += 1
+        if key == node.key:
+            return node, comparisons
+        node = node.left if key < node.key else node.right
+    return None, comparisons
+
+# Function to compute the weighted search cost sum(weight * depth) and the height of a tree
+def bst_cost(root):
+    cost = 0
+    height = 0
+    stack = [(root, 1)] if root is not None else []
+    while stack:
+        node, depth = stack.pop()
+        cost += node.weight * depth
+        height = max(height, depth)
+        if node.left is not None:
+            stack.append((node.left, depth + 1))
+        if node.right is not None:
+            stack.append((node.right, depth + 1))
+    return cost, height
+
+# Function to replay a frequency-weighted query stream against each kind of tree
+# Returns {tree name: {"comparisons_per_lookup", "lookups_per_sec", "height", "cost"}}
+def benchmark_trees(word_freq, queries=100000, seed=0):
+    rng = random.Random(seed)
+    keys = sorted(word_freq)
+    frequencies = [word_freq[key] for key in keys]
+    shuffled = keys[:]
+    rng.shuffle(shuffled)
+    trees = {
+        "regular BST": build_regular_bst(shuffled, [word_freq[key] for key in shuffled]),
+        "optimal BST": build_optimal_bst(keys, frequencies),
+        "weight-balanced BST": build_weight_balanced_bst(keys, frequencies),
+    }
+    stream = rng.choices(keys, weights=frequencies, k=queries)
+
+    results = {}
+    for name, root in trees.items():
+        comparisons = sum(bst_search(root, key)[1] for key in stream)
+        started = time.perf_counter()
+        for key in stream:
+            bst_search(root, key)
+        elapsed = time.perf_counter() - started
+        cost, height = bst_cost(root)
+        results[name] = {
+            "comparisons_per_lookup": comparisons / queries,
+            "lookups_per_sec": queries / elapsed if elapsed else float('inf'),
+            "height": height,
+            "cost": cost,
+        }
+    return results
+
+# Function to return the word cloud stop words, or an empty set if wordcloud is not installed
+def default_stopwords():
+    try:
+        from wordcloud import STOPWORDS
+    except ImportError:
+        return frozenset()
+    return frozenset(STOPWORDS)
+
+# Function to list the text files of a path (a file, or every file under a directory, in sorted order)
+def text_files(path):
+    if os.path.isfile(path):
+        return [path]
+    files = []
+    for folder, subfolders, names in os.walk(path):
+        subfolders.sort()
+        files.extend(os.path.join(folder, name) for name in sorted(names))
+    return files
+
+# Function to count words in a stream of lines; only one line is held in memory at a time
+def count_words(lines, stopwords=()):
+    counts = Counter()
+    for line in lines:
+        counts.update(word for word in (match.lower() for match in WORD_PATTERN.findall(line))
+                      if word not in stopwords)
+    return counts
+
+# Function to compute the cache key of some files: a hash of their contents,
+# the stop words and the tokenizer version (file names and dates do not matter)
+def frequency_cache_key(files, stopwords=()):
+    digest = hashlib.sha256(f"tokenizer {TOKENIZER_VERSION}\n".encode())
+    digest.update("\n".join(sorted(stopwords)).encode("utf-8"))
+    for name in files:
+        with open(name, "rb") as file:
+            size = 0
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+                size += len(chunk)
+        digest.update(f"\0{size}\0".encode())  # File boundary, so "ab" + "c" != "a" + "bc"
+    return digest.hexdigest()
+
+# Function to read word frequencies from local text files, without the network or WordCloud
+# Counted tables are cached on disk under their content hash, so reading the same
+# corpus again only re-hashes the files; cache_dir=None disables the cache
+def get_word_frequencies_from_files(path, stopwords=(), cache_dir=CACHE_DIR):
+    files = text_files(path)
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, frequency_cache_key(files, stopwords) + ".json")
+        if os.path.isfile(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as file:
+                return Counter(json.load(file))
+
+    counts = Counter()
+    for name in files:
+        with open(name, "r", encoding="utf-8", errors="replace") as file:
+            counts.update(count_words(file, stopwords))
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary = f"{cache_file}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(counts, file)
+        os.replace(temporary, cache_file)  # Atomic, so a half-written table is never read
+    return counts
 
 # Function to scrape webpage content and generate a word cloud
 def get_word_cloud_from_webpage(url):
+    from requests_html import HTMLSession  # Importing HTMLSession from requests_html to scrape webpage content
+    from wordcloud import WordCloud, STOPWORDS  # Importing WordCloud for generating word clouds and STOPWORDS for excluding common words
+
     session = HTMLSession()  # Create a new session to handle the HTTP request
     response = session.get(url)  # Send GET request to the specified URL
     article_text = ' '.join(p.text for p in response.html.find('p'))  # Extract all text inside <p> tags
@@ -73,40 +347,33 @@ def get_word_cloud_from_webpage(url):
     return word_frequencies  # Return the frequencies for further analysis
 
 # Function to simulate the comparison between a regular BST and OBST
-def compare_trees(word_cloud):
+# Both costs are the frequency-weighted depth of the top 50 words in a real tree
+def compare_trees(word_cloud, seed=None):
     # Sort the word frequencies in descending order and select the top 50
-    sorted_word_freq = sorted(word_cloud.items(), key=lambda x: x[1], reverse=True)
-    top_words = [word for word, _ in sorted_word_freq[:50]]  # Get the top 50 words
-    frequencies = [freq for _, freq in sorted_word_freq[:50]]  # Get the frequencies of those words
-    
-    # Shuffle the word list to simulate randomness in the tree structure
-    random.shuffle(top_words)
-    
-    # Calculate the traversal cost of the regular BST
-    bst_cost = regular_bst_cost(top_words, frequencies)
-    
-    # Calculate the traversal cost of the optimal BST (OBST)
-    obst_cost = optimal_bst(frequencies, len(frequencies))
-    
-    # Return the costs of both trees for comparison
-    return bst_cost, obst_cost
+    sorted_word_freq = sorted(word_cloud.items(), key=lambda x: x[1], reverse=True)[:50]
 
-# Main function to execute the workflow
-def main():
-    # URL of the webpage to scrape and analyze
-    url = 'https://gkids.com/ghiblifest/'  # Example URL for testing
+    # Shuffle the (word, frequency) pairs to simulate randomness in the insertion order
+    shuffled = sorted_word_freq[:]
+    random.Random(seed).shuffle(shuffled)
 
-    # Get the word frequencies from the webpage
-    word_cloud = get_word_cloud_from_webpage(url)
+    # Calculate the traversal cost of the regular BST built in that order
+    regular_cost, _ = bst_cost(build_regular_bst([word for word, _ in shuffled], [freq for _, freq in shuffled]))
 
-    # Compare the traversal costs of the regular BST and the OBST
-    bst_cost, obst_cost = compare_trees(word_cloud)
+    # Calculate the traversal cost of the optimal BST (OBST) over the words in key order
+    frequencies = [freq for _, freq in sorted(sorted_word_freq)]
+    obst_cost = optimal_bst(frequencies, len(frequencies), knuth=True)
 
-    # Print the results of the comparison
-    print(f"Regular BST traversal cost: {bst_cost:.2f}")
-    print(f"Optimal BST traversal cost: {obst_cost:.2f}")
+    # Return the costs of both trees for comparison
+    return regular_cost, obst_cost
+
+# Function to display a word cloud of the given frequencies
+def show_word_cloud(word_cloud):
+    from wordcloud import WordCloud  # Importing WordCloud for generating word clouds
+    import matplotlib.pyplot as plt  # Importing matplotlib for visualizing the word cloud
+    import matplotlib.colors as mcolors  # Importing mcolors for defining custom colormap
 
     # Visualize the word cloud with the defined custom colormap and background color
+    custom_cmap = mcolors.ListedColormap(CUSTOM_COLORS)
     wordcloud = WordCloud(width=1000, height=500, background_color='#071932', colormap=custom_cmap).generate_from_frequencies(word_cloud)
 
     # Set the background color of the plot to match the word cloud's background
@@ -119,6 +386,34 @@ def main():
     plt.tight_layout(pad=0)  # Adjust layout for no padding
     plt.show()  # Show the generated word cloud
 
+# Main function to execute the workflow
+# `source` is a URL to scrape, or a local text file / directory to read offline
+def main(source='https://gkids.com/ghiblifest/'):  # Example URL for testing
+    if os.path.exists(source):
+        # Count the words of the local files (cached after the first run)
+        word_cloud = get_word_frequencies_from_files(source, default_stopwords())
+    else:
+        # Get the word frequencies from the webpage
+        word_cloud = get_word_cloud_from_webpage(source)
+
+    # Compare the traversal costs of the regular BST and the OBST
+    regular_cost, obst_cost = compare_trees(word_cloud)
+
+    # Print the results of the comparison
+    print(f"Regular BST traversal cost: {regular_cost:.2f}")
+    print(f"Optimal BST traversal cost: {obst_cost:.2f}")
+
+    # Replay a frequency-weighted stream of lookups against real trees
+    for name, result in benchmark_trees(word_cloud).items():
+        print(f"{name}: {result['comparisons_per_lookup']:.2f} comparisons/lookup, "
+              f"{result['lookups_per_sec']:,.0f} lookups/sec, height {result['height']}")
+
+    # Show the word cloud if the plotting stack is installed
+    try:
+        show_word_cloud(word_cloud)
+    except ImportError as error:
+        print(f"Skipping the word cloud ({error.name} is not installed)")
+
 # Run the main function
 if __name__ == '__main__':
-    main()  # Call the main function to execute the code
+    main(*sys.argv[1:2])  # Optional URL, file or directory; call the main function to execute the code
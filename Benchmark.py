@@ -0,0 +1,187 @@
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+from Dijkstra import dijkstra
+from GraphGenerators import GENERATORS, build_graph, generate
+from ResourceUsage import peak_rss_mb
+from SearchTracer import SearchStats
+from ShortestDistanceCity import dijkstra_city_distance, primMST
+
+# #########################
+#
+#  Scaling benchmark
+#
+# #########################
+# Runs every engine on every generated graph and writes a JSON report:
+#   python Benchmark.py run --sizes 1000 10000 100000 --output today.json
+#   python Benchmark.py compare yesterday.json today.json
+# Each (graph, engine) case runs in a fresh process, so its peak RSS is its
+# own. Wall time is measured without a tracer; a second, traced run counts the
+# nodes settled and edges relaxed.
+
+REPORT_VERSION = 1
+DEFAULT_SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+
+
+def _run_dijkstra(graph, source, tracer=None):
+    dijkstra(graph, source, tracer=tracer)
+
+
+def _run_city(graph, source, tracer=None):
+    dijkstra_city_distance(graph, source, tracer=tracer)
+
+
+def _run_prim(graph, source, tracer=None):
+    parent, _ = primMST(graph, source, verbose=False)
+    if tracer is not None:
+        # primMST has no tracer hooks; every node joined to the tree counts as settled
+        tracer.settled += sum(1 for p in parent.values() if p is not None)
+
+
+ENGINES = {
+    "dijkstra": _run_dijkstra,
+    "dijkstra_city_distance": _run_city,
+    "primMST": _run_prim,
+}
+
+
+def run_case(kind, edges, engine, seed=0, csr=False, repeat=1):
+    """Generate one graph, run one engine from node 0 and return the measurements.
+
+    The wall time is the best of `repeat` runs.
+    """
+    started = time.perf_counter()
+    graph = build_graph(generate(kind, edges, seed), csr=csr)
+    build_seconds = time.perf_counter() - started
+
+    run = ENGINES[engine]
+    seconds = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(graph, 0)
+        seconds = min(seconds, time.perf_counter() - started)
+
+    stats = SearchStats()
+    run(graph, 0, tracer=stats)
+    return {
+        "graph": kind,
+        "size": edges,
+        "engine": engine,
+        "nodes": len(graph.nodes),
+        "edges": graph.edge_count() if csr else len(graph.distances),
+        "build_seconds": build_seconds,
+        "seconds": seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "settled": stats.settled,
+        "relaxed": stats.relaxed if engine != "primMST" else None,
+    }
+
+
+def run(kinds=tuple(GENERATORS), sizes=DEFAULT_SIZES, engines=tuple(ENGINES), seed=0, csr=False,
+        repeat=1, isolate=True, log=print):
+    """Run every (kind, size, engine) case and return the report dict.
+
+    isolate=True runs each case in a new process so peak RSS is per case.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for kind in kinds:
+        for size in sizes:
+            for engine in engines:
+                if isolate:
+                    with context.Pool(1) as pool:
+                        result = pool.apply(run_case, (kind, size, engine, seed, csr, repeat))
+                else:
+                    result = run_case(kind, size, engine, seed, csr, repeat)
+                results.append(result)
+                if log is not None:
+                    log(f"{kind:>10} {size:>9} {engine:>24}: {result['seconds']:9.4f} s, "
+                        f"{result['settled']} settled, peak RSS {result['peak_rss_mb'] or 0:.1f} MB")
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "csr": csr,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """Match the cases of two reports and return rows of (case, old s, new s, ratio, regressed).
+
+    A case regresses when it got slower by more than `threshold` (0.10 = 10%).
+    Cases missing from either report are skipped. Raises ValueError if the
+    reports were run with a different graph class (csr) or seed, since their
+    cases are then not the same.
+    """
+    for setting in ("csr", "seed"):
+        if baseline.get(setting) != current.get(setting):
+            raise ValueError(f"reports differ in {setting}: "
+                             f"{baseline.get(setting)!r} vs {current.get(setting)!r}")
+
+    def key(result):
+        return result["graph"], result["size"], result["engine"]
+
+    before = {key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        rows.append((key(result), old["seconds"], result["seconds"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scaling benchmark for the shortest-path and MST code.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmark and write a JSON report")
+    run_parser.add_argument("--graphs", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    run_parser.add_argument("--sizes", nargs="+", type=lambda text: int(float(text)), default=list(DEFAULT_SIZES),
+                            help="approximate directed edge counts, e.g. 1e3 1e5 1e7")
+    run_parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--csr", action="store_true", help="run on CSRGraph instead of Graph")
+    run_parser.add_argument("--repeat", type=int, default=1, help="report the best of this many timed runs")
+    run_parser.add_argument("--in-process", action="store_true", help="do not isolate cases (peak RSS is shared)")
+    run_parser.add_argument("--output", default="benchmark.json")
+    compare_parser = commands.add_parser("compare", help="compare two reports, exit 1 on regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.graphs, args.sizes, args.engines, args.seed, args.csr, args.repeat, isolate=not args.in_process)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    try:
+        rows = compare(baseline, current, args.threshold)
+    except ValueError as error:
+        print(f"Cannot compare {args.baseline} with {args.current}: {error}", file=sys.stderr)
+        return 2
+    regressions = 0
+    for (kind, size, engine), old, new, ratio, regressed in rows:
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{kind:>10} {size:>9} {engine:>24}: {old:9.4f} s -> {new:9.4f} s ({ratio:5.2f}x){flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
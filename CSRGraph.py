@@ -0,0 +1,223 @@
+from array import array
+from collections.abc import Mapping
+
+# #########################
+#
+#  CSR (compressed sparse row) graph
+#
+# #########################
+# A frozen, array-backed version of the Graph classes in Dijkstra.py and
+# ShortestDistanceCity.py. Node labels are interned to ids 0..V-1 and the
+# outgoing edges of node i are targets[offsets[i]:offsets[i+1]] with the matching
+# weights, so an edge costs 16 bytes instead of a tuple key plus a dict entry.
+#
+# It offers the same read interface the shortest-path and MST functions use:
+#   nodes, neighbors(node), edges[node], distances[(from_node, to_node)]
+
+
+class CSRGraph:
+    """Immutable directed graph stored as offset / target / weight arrays."""
+    __slots__ = ("labels", "index", "offsets", "targets", "weights", "__weakref__")
+    version = 0  # Never changes (Graph bumps its version on every edit)
+
+    def __init__(self, labels, offsets, targets, weights):
+        # Any indexable sequences work (array, memoryview, NumPy array)
+        if isinstance(labels, range) and labels.step == 1:
+            # Labels first, first+1, ... (DIMACS ids): the id is an offset, no list or dict is built
+            object.__setattr__(self, "labels", labels)
+            object.__setattr__(self, "index", _RangeIndex(labels.start, len(labels)))
+        else:
+            object.__setattr__(self, "labels", list(labels))  # id -> node label
+            object.__setattr__(self, "index", {label: i for i, label in enumerate(self.labels)})  # label -> id
+        object.__setattr__(self, "offsets", offsets)  # len V+1, edge range of each node
+        object.__setattr__(self, "targets", targets)  # len E, target id of each edge
+        object.__setattr__(self, "weights", weights)  # len E, weight of each edge
+        if len(offsets) != len(self.labels) + 1 or len(targets) != len(weights):
+            raise ValueError("offsets must have V+1 entries and targets/weights the same length")
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CSRGraph is immutable")
+
+    # #########################
+    #  Construction
+    # #########################
+    @classmethod
+    def from_edges(cls, edges, nodes=()):
+        """Build from an iterable of (from_node, to_node, distance) triples.
+
+        `nodes` adds isolated nodes; node ids follow first appearance.
+        Integer weights are stored as 64-bit ints, anything else as doubles.
+        """
+        index = {}
+        labels = []
+
+        def intern(label):
+            i = index.get(label)
+            if i is None:
+                i = index[label] = len(labels)
+                labels.append(label)
+            return i
+
+        for node in nodes:
+            intern(node)
+
+        sources = array("q")
+        targets = array("q")
+        weights = array("q")
+        for from_node, to_node, distance in edges:
+            sources.append(intern(from_node))
+            targets.append(intern(to_node))
+            if weights.typecode == "q" and not isinstance(distance, int):
+                weights = array("d", weights)  # First non-integer weight switches to doubles
+            weights.append(distance)
+        return cls._from_coo(labels, sources, targets, weights)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Build from a Graph (anything with `nodes`, `edges` and `distances`)."""
+        def edge_list():
+            for from_node in list(graph.edges):
+                for to_node in graph.edges[from_node]:
+                    yield from_node, to_node, graph.distances[(from_node, to_node)]
+        return cls.from_edges(edge_list(), sorted(graph.nodes, key=str))
+
+    @classmethod
+    def _from_coo(cls, labels, sources, targets, weights):
+        """Counting-sort (source, target, weight) triples into CSR order, keeping edge order per node."""
+        size = len(labels)
+        offsets = array("q", bytes(8 * (size + 1)))
+        for u in sources:
+            offsets[u + 1] += 1
+        for i in range(size):
+            offsets[i + 1] += offsets[i]
+
+        fill = array("q", offsets[:-1])  # Next free slot of each node
+        csr_targets = array("q", bytes(8 * len(targets)))
+        csr_weights = array(weights.typecode, bytes(weights.itemsize * len(weights)))
+        for u, v, w in zip(sources, targets, weights):
+            k = fill[u]
+            csr_targets[k] = v
+            csr_weights[k] = w
+            fill[u] = k + 1
+        return cls(labels, offsets, csr_targets, csr_weights)
+
+    def reverse(self):
+        """Return a CSRGraph with every edge flipped (same node ids)."""
+        size = len(self.labels)
+        sources = array("q", bytes(8 * len(self.targets)))
+        for i in range(size):
+            for k in range(self.offsets[i], self.offsets[i + 1]):
+                sources[k] = i
+        weights = self.weights if isinstance(self.weights, array) else array(memoryview(self.weights).format, self.weights)
+        return CSRGraph._from_coo(self.labels, array("q", self.targets), sources, weights)
+
+    # #########################
+    #  Graph interface
+    # #########################
+    @property
+    def nodes(self):
+        """All node labels, in id order."""
+        return self.labels
+
+    @property
+    def edges(self):
+        """Read-only adjacency view: edges[node] is the list of neighbor labels."""
+        return _EdgeView(self)
+
+    @property
+    def distances(self):
+        """Read-only weight view: distances[(from_node, to_node)] is the edge weight."""
+        return _DistanceView(self)
+
+    def neighbors(self, node):
+        """Yield (neighbor, distance) for every edge leaving `node`."""
+        i = self.index.get(node)
+        if i is None:
+            return
+        labels, targets, weights = self.labels, self.targets, self.weights
+        for k in range(self.offsets[i], self.offsets[i + 1]):
+            yield labels[targets[k]], weights[k]
+
+    def node_count(self):
+        return len(self.labels)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def nbytes(self):
+        """Bytes used by the offset, target and weight arrays."""
+        return sum(len(a) * memoryview(a).itemsize for a in (self.offsets, self.targets, self.weights))
+
+    def to_numpy(self):
+        """Return (offsets, targets, weights) as NumPy arrays sharing this graph's memory."""
+        import numpy as np  # Optional dependency, only needed here
+        return tuple(np.asarray(memoryview(a)) for a in (self.offsets, self.targets, self.weights))
+
+    def __contains__(self, node):
+        return node in self.index
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __repr__(self):
+        return f"CSRGraph({self.node_count()} nodes, {self.edge_count()} edges)"
+
+
+class _RangeIndex(Mapping):
+    """Mapping of label -> id for the labels first .. first + size - 1."""
+    __slots__ = ("first", "size")
+
+    def __init__(self, first, size):
+        self.first = first
+        self.size = size
+
+    def __getitem__(self, label):
+        if isinstance(label, int) and 0 <= label - self.first < self.size:
+            return label - self.first
+        raise KeyError(label)
+
+    def __iter__(self):
+        return iter(range(self.first, self.first + self.size))
+
+    def __len__(self):
+        return self.size
+
+
+class _EdgeView(Mapping):
+    """Mapping of node -> list of neighbor labels over a CSRGraph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, node):
+        # Like defaultdict(list): unknown nodes have no neighbors
+        return [v for v, _ in self.graph.neighbors(node)]
+
+    def __iter__(self):
+        return iter(self.graph.labels)
+
+    def __len__(self):
+        return len(self.graph.labels)
+
+
+class _DistanceView(Mapping):
+    """Mapping of (from_node, to_node) -> weight over a CSRGraph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, key):
+        from_node, to_node = key
+        for v, w in self.graph.neighbors(from_node):
+            if v == to_node:
+                return w
+        raise KeyError(key)
+
+    def __iter__(self):
+        g = self.graph
+        for i, label in enumerate(g.labels):
+            for k in range(g.offsets[i], g.offsets[i + 1]):
+                yield label, g.labels[g.targets[k]]
+
+    def __len__(self):
+        return len(self.graph.targets)
@@ -0,0 +1,326 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from ResourceUsage import peak_rss_mb
+from TinyUnzip import BLOCK_SIZE, decompressStream, huffmanCode, readBlocks, zip
+
+# #########################
+#
+#  TinyUnzip codec benchmark
+#
+# #########################
+# Times each stage of the codec on its own over a generated corpus and writes
+# a JSON report:
+#   python CodecBenchmark.py run --sizes 1e3 1e6 1e9 --output today.json
+#   python CodecBenchmark.py compare yesterday.json today.json
+# Stages:
+#   count   frequency counting over the file, one block at a time
+#   table   Huffman code from the counts (the decoder builds its own tree from
+#           the canonical lengths stored in each block, timed under decode)
+#   encode  zip() with that code table (streamed, block index included)
+#   decode  decompressStream over the compressed file, checked block by block
+#           against the original (the check itself is not timed)
+# Every stage reports MB/s of input and its peak traced allocation (a second,
+# tracemalloc run), and each (corpus, size) case runs in a fresh process so its
+# peak RSS is its own. Corpora are generated once per seed and kept on disk.
+
+REPORT_VERSION = 1
+DEFAULT_SIZES = (10 ** 3, 10 ** 5, 10 ** 7)
+STAGES = ("count", "table", "encode", "decode")
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "tinyzip")
+CHUNK = 1 << 20  # Corpus bytes generated per step
+
+
+# #########################
+#  Corpus generators
+# #########################
+# Each generator returns `size` symbols (str for text corpora, bytes otherwise)
+# drawn from `rng`; the corpus file is written one CHUNK at a time.
+def text_chunk(rng, size, vocabulary=5000):
+    """English-like text: Zipf-distributed words from a fixed random vocabulary, with line breaks."""
+    words = _vocabulary(vocabulary)
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    picked = rng.choices(words, cum_weights=_cumulative(weights), k=size // 3 + 1)
+    lines = (" ".join(picked[i:i + 12]) for i in range(0, len(picked), 12))
+    return ".\n".join(lines)[:size]
+
+
+def log_chunk(rng, size):
+    """Web-server style log lines: timestamps, levels, paths, status codes and latencies."""
+    levels = rng.choices(["INFO", "DEBUG", "WARN", "ERROR"], [70, 20, 8, 2], k=size // 60 + 1)
+    lines = []
+    for level in levels:
+        lines.append(f"2024-11-{rng.randint(1, 30):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:"
+                     f"{rng.randint(0, 59):02d}.{rng.randint(0, 999):03d} {level} [worker-{rng.randint(1, 8)}] "
+                     f"{rng.choice(['GET', 'GET', 'GET', 'POST', 'PUT'])} /api/{rng.choice(['items', 'users', 'orders'])}/"
+                     f"{rng.randint(1, 99999)} {rng.choice([200, 200, 200, 201, 304, 404, 500])} "
+                     f"{int(rng.expovariate(1 / 40))}ms\n")
+    return "".join(lines)[:size]
+
+
+def skewed_chunk(rng, size):
+    """Bytes with a geometric distribution (byte value k about twice as likely as k + 1)."""
+    return rng.randbytes(size).translate(_SKEWED)
+
+
+def uniform_chunk(rng, size):
+    """Uniformly random bytes (incompressible: every code is 8 bits)."""
+    return rng.randbytes(size)
+
+
+def _vocabulary(count, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choices("etaoinshrdlcumwfgypbvkjxqz", k=rng.randint(1, 9))) for _ in range(count)]
+
+
+def _cumulative(weights):
+    total, sums = 0, []
+    for weight in weights:
+        total += weight
+        sums.append(total)
+    return sums
+
+
+def _skewed_table():
+    """Translation table from uniform bytes to geometric ones: value k fills about 256 / 2**(k+1) slots."""
+    slots = []
+    for value in range(256):
+        slots.extend([value] * max(1, round(256 / 2 ** (value + 1))))
+        if len(slots) >= 256:
+            break
+    return bytes(slots[:256])
+
+
+_SKEWED = _skewed_table()
+
+CORPORA = {
+    "text": (text_chunk, False),
+    "logs": (log_chunk, False),
+    "skewed": (skewed_chunk, True),
+    "uniform": (uniform_chunk, True),
+}
+
+
+def corpus_file(kind, size, seed=0, folder=CACHE_DIR):
+    """Return the path of a `size`-symbol corpus of `kind`, generating it on first use."""
+    generate, binary = CORPORA[kind]
+    path = os.path.join(folder, f"{kind}-{size}-{seed}.{'bin' if binary else 'txt'}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(f"{kind}-{seed}")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb" if binary else "w") as file:
+        for start in range(0, size, CHUNK):
+            file.write(generate(rng, min(CHUNK, size - start)))
+    os.replace(temporary, path)  # Never leave a partial corpus behind
+    return path
+
+
+# #########################
+#  Stages
+# #########################
+def run_stages(path, binary, block_size=BLOCK_SIZE, trace=False):
+    """Run count, table, encode and decode on one file; returns ({stage: (seconds, peak bytes)}, facts).
+
+    With trace=True each stage runs under tracemalloc and its peak traced
+    allocation is reported (the timings are then slower). Raises
+    AssertionError if the decoded data differs from the input.
+    """
+    mode = "rb" if binary else "r"
+    zip_file = f"{path}.{os.getpid()}.tz"
+    stages = {}
+    state = {}
+
+    def measure(stage, function):
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - started
+        peak = None
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        stages[stage] = (seconds, peak)
+        return result
+
+    def count():
+        freq = Counter()
+        with open(path, mode) as file:
+            for chunk in readBlocks(file, block_size):
+                freq.update(chunk)
+        return freq
+
+    def table():
+        return huffmanCode(state["freq"]) if state["freq"] else {}
+
+    def decode():
+        # Time only the decoding; comparing with the original happens between blocks
+        seconds = 0.0
+        with open(zip_file, "rb") as compressed, open(path, mode) as original:
+            blocks = decompressStream(compressed)
+            expected = readBlocks(original, block_size)
+            while True:
+                started = time.perf_counter()
+                block = next(blocks, None)
+                seconds += time.perf_counter() - started
+                if block is None:
+                    break
+                if block and block != next(expected, None):
+                    raise AssertionError(f"Round trip of {path} differs")
+            if next(expected, None) is not None:
+                raise AssertionError(f"Round trip of {path} lost data")
+        return seconds
+
+    try:
+        state["freq"] = measure("count", count)
+        state["huffman"] = measure("table", table)
+        measure("encode", lambda: zip(path, zip_file, state["huffman"], block_size, binary, verbose=False))
+        seconds = measure("decode", decode)
+        stages["decode"] = (seconds, stages["decode"][1])
+        facts = {
+            "symbols": sum(state["freq"].values()),
+            "distinct": len(state["freq"]),
+            "input_bytes": os.path.getsize(path),
+            "output_bytes": os.path.getsize(zip_file),
+        }
+    finally:
+        if os.path.exists(zip_file):
+            os.remove(zip_file)
+    return stages, facts
+
+
+def run_case(kind, size, seed=0, block_size=BLOCK_SIZE, repeat=1, memory=True, folder=CACHE_DIR):
+    """Benchmark one corpus and return the measurements (best of `repeat` untraced runs per stage)."""
+    path = corpus_file(kind, size, seed, folder)
+    binary = CORPORA[kind][1]
+    best = {}
+    for _ in range(repeat):
+        stages, facts = run_stages(path, binary, block_size)
+        for stage, (seconds, _) in stages.items():
+            best[stage] = min(best.get(stage, float("inf")), seconds)
+    peaks = run_stages(path, binary, block_size, trace=True)[0] if memory else {}
+
+    megabytes = facts["input_bytes"] / 1e6
+    return {
+        "corpus": kind,
+        "size": size,
+        **facts,
+        "ratio": facts["output_bytes"] / facts["input_bytes"] if facts["input_bytes"] else None,
+        "verified": True,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": {stage: {
+            "seconds": best[stage],
+            "MB_per_s": megabytes / best[stage] if best[stage] else None,
+            "peak_traced_mb": peaks[stage][1] / 2 ** 20 if stage in peaks else None,
+        } for stage in STAGES},
+    }
+
+
+def run(kinds=tuple(CORPORA), sizes=DEFAULT_SIZES, seed=0, block_size=BLOCK_SIZE, repeat=1, memory=True,
+        isolate=True, folder=CACHE_DIR, log=print):
+    """Run every (corpus, size) case and return the report dict.
+
+    isolate=True runs each case in a new process so peak RSS is per case.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for kind in kinds:
+        for size in sizes:
+            arguments = (kind, size, seed, block_size, repeat, memory, folder)
+            if isolate:
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_case, arguments)
+            else:
+                result = run_case(*arguments)
+            results.append(result)
+            if log is not None:
+                rates = ", ".join(f"{stage} {result['stages'][stage]['MB_per_s'] or 0:7.2f}" for stage in STAGES)
+                log(f"{kind:>8} {size:>11}: ratio {result['ratio'] or 0:.3f}, MB/s {rates}, "
+                    f"peak RSS {result['peak_rss_mb'] or 0:.1f} MB")
+    return {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "block_size": block_size,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """Match the stages of two reports and return rows of (case, old MB/s, new MB/s, ratio, regressed).
+
+    A stage regresses when its throughput dropped by more than `threshold`
+    (0.10 = 10%). Cases missing from either report are skipped.
+    """
+    before = {(r["corpus"], r["size"]): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = before.get((result["corpus"], result["size"]))
+        if old is None:
+            continue
+        for stage in STAGES:
+            old_rate = old["stages"][stage]["MB_per_s"]
+            new_rate = result["stages"][stage]["MB_per_s"]
+            if not old_rate or not new_rate:
+                continue
+            ratio = new_rate / old_rate
+            rows.append(((result["corpus"], result["size"], stage), old_rate, new_rate, ratio,
+                         ratio < 1 - threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage throughput benchmark for the TinyUnzip codec.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmark and write a JSON report")
+    run_parser.add_argument("--corpora", nargs="+", default=list(CORPORA), choices=list(CORPORA))
+    run_parser.add_argument("--sizes", nargs="+", type=lambda text: int(float(text)), default=list(DEFAULT_SIZES),
+                            help="corpus sizes in symbols, e.g. 1e3 1e6 1e9")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    run_parser.add_argument("--repeat", type=int, default=1, help="report the best of this many timed runs")
+    run_parser.add_argument("--no-memory", action="store_true", help="skip the traced run (no per-stage peaks)")
+    run_parser.add_argument("--in-process", action="store_true", help="do not isolate cases (peak RSS is shared)")
+    run_parser.add_argument("--corpus-dir", default=CACHE_DIR)
+    run_parser.add_argument("--output", default="codec-benchmark.json")
+    compare_parser = commands.add_parser("compare", help="compare two reports, exit 1 on regressions")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.corpora, args.sizes, args.seed, args.block_size, args.repeat, not args.no_memory,
+                     isolate=not args.in_process, folder=args.corpus_dir)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = 0
+    for (kind, size, stage), old, new, ratio, regressed in compare(baseline, current, args.threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{kind:>8} {size:>11} {stage:>7}: {old:9.2f} MB/s -> {new:9.2f} MB/s ({ratio:5.2f}x){flag}")
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import math
+import pickle
+import random
+import time
+from PriorityQueues import LazyHeap
+from ShortestDistanceCity import build_city_graph, dijkstra_city_distance
+
+# #########################
+#
+#  Contraction hierarchies (CH)
+#
+# #########################
+# Preprocessing contracts the nodes one at a time in order of "importance".
+# Contracting v removes it and adds a shortcut u -> w (weight u->v + v->w)
+# whenever u -> v -> w is the only shortest route between u and w. Afterwards
+# every shortest path can be found by a bidirectional search that only moves
+# "upward" (to nodes contracted later), which settles a few hundred nodes even
+# on continental road graphs. Shortcuts remember the node they skip, so the
+# query can unpack them back into the original path.
+
+FORMAT_VERSION = 1
+
+
+class ContractionHierarchy:
+    """Node ranks plus upward edges; build() preprocesses, query() answers routes."""
+
+    def __init__(self, rank, up, down, middle):
+        self.rank = rank  # node -> contraction order
+        self.up = up  # node -> [(higher node, weight)] following edges forward
+        self.down = down  # node -> [(higher node, weight)] following edges backward
+        self.middle = middle  # (u, w) -> node skipped by shortcut u -> w (original edges are not listed)
+
+    # #########################
+    #  Preprocessing
+    # #########################
+    @classmethod
+    def build(cls, graph, settle_limit=50):
+        """Contract every node of `graph` (Graph or CSRGraph).
+
+        `settle_limit` bounds each witness search; a smaller limit preprocesses
+        faster but may add shortcuts that are not strictly needed.
+        """
+        out = {u: {} for u in graph.nodes}  # Remaining graph: out[u][v] = weight
+        inn = {u: {} for u in graph.nodes}  # and the same edges backward: inn[v][u]
+        middle = {}
+        for u in list(graph.nodes):
+            for v, distance in graph.neighbors(u):
+                if u == v:
+                    continue
+                out.setdefault(v, {})
+                inn.setdefault(v, {})
+                # Parallel edges: keep the lightest
+                if distance < out[u].get(v, math.inf):
+                    out[u][v] = distance
+                    inn[v][u] = distance
+
+        contracted_neighbors = dict.fromkeys(out, 0)
+        order = LazyHeap()
+        for v in out:
+            order.push(v, cls._priority(v, out, inn, contracted_neighbors, settle_limit))
+
+        rank = {}
+        up = {}
+        down = {}
+        while order:
+            v, priority = order.pop()
+            # Lazy update: re-check the priority, put v back if it is no longer the smallest
+            current = cls._priority(v, out, inn, contracted_neighbors, settle_limit)
+            if order and current > order.peek()[1]:
+                order.push(v, current)
+                continue
+
+            for u, w, weight in cls._shortcuts(v, out, inn, settle_limit):
+                if weight < out[u].get(w, math.inf):
+                    out[u][w] = weight
+                    inn[w][u] = weight
+                    middle[(u, w)] = v
+
+            # Everything still attached to v ranks higher, so these edges point upward
+            rank[v] = len(rank)
+            up[v] = list(out[v].items())
+            down[v] = list(inn[v].items())
+            for w in out[v]:
+                del inn[w][v]
+                contracted_neighbors[w] += 1
+            for u in inn[v]:
+                del out[u][v]
+                contracted_neighbors[u] += 1
+            del out[v], inn[v]
+
+        return cls(rank, up, down, middle)
+
+    @staticmethod
+    def _shortcuts(v, out, inn, settle_limit):
+        """List the shortcuts (u, w, weight) needed if v were contracted now."""
+        shortcuts = []
+        targets = out[v]
+        if not targets:
+            return shortcuts
+        longest_out = max(targets.values())
+        for u, in_weight in inn[v].items():
+            witness = _witness_search(out, u, v, in_weight + longest_out, settle_limit)
+            for w, out_weight in targets.items():
+                if w == u:
+                    continue
+                weight = in_weight + out_weight
+                if witness.get(w, math.inf) > weight:
+                    shortcuts.append((u, w, weight))
+        return shortcuts
+
+    @classmethod
+    def _priority(cls, v, out, inn, contracted_neighbors, settle_limit):
+        """Edge difference (shortcuts added - edges removed) plus contracted neighbors."""
+        added = len(cls._shortcuts(v, out, inn, settle_limit))
+        return added - len(out[v]) - len(inn[v]) + contracted_neighbors[v]
+
+    # #########################
+    #  Serialization
+    # #########################
+    def save(self, path):
+        """Write the augmented graph (ranks, upward edges, shortcuts) to `path`."""
+        with open(path, "wb") as file:
+            pickle.dump({"version": FORMAT_VERSION, "rank": self.rank, "up": self.up,
+                         "down": self.down, "middle": self.middle}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Read a hierarchy written by save()."""
+        with open(path, "rb") as file:
+            data = pickle.load(file)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a contraction hierarchy (format {FORMAT_VERSION})")
+        return cls(data["rank"], data["up"], data["down"], data["middle"])
+
+    def shortcut_count(self):
+        return len(self.middle)
+
+    # #########################
+    #  Query
+    # #########################
+    def query(self, source, target):
+        """Return (distance, [source, ..., target]), or (math.inf, []) if there is no route."""
+        if source not in self.rank or target not in self.rank:
+            return math.inf, []
+        if source == target:
+            return 0, [source]
+
+        # Index 0 searches upward from the source, index 1 upward (backward) from the target
+        edges = (self.up, self.down)
+        dist = ({source: 0}, {target: 0})
+        pred = ({}, {})
+        queues = (LazyHeap(), LazyHeap())
+        queues[0].push(source, 0)
+        queues[1].push(target, 0)
+        best = math.inf
+        meet = None
+
+        for side in (0, 1):
+            queue, d_side = queues[side], dist[side]
+            while queue:
+                u, d = queue.pop()
+                # Upward searches cannot stop at the first meeting; prune by the best so far.
+                # The forward search runs to completion, so the backward one sees final distances
+                if d >= best:
+                    break
+                other = dist[1 - side].get(u)
+                if other is not None and d + other < best:
+                    best, meet = d + other, u
+                for v, weight in edges[side][u]:
+                    candidate = d + weight
+                    if candidate < d_side.get(v, math.inf):
+                        d_side[v] = candidate
+                        pred[side][v] = u
+                        queue.push(v, candidate)
+
+        if meet is None:
+            return math.inf, []
+
+        # Climb both halves back to the endpoints, then expand every shortcut
+        up_path = [meet]
+        while up_path[-1] != source:
+            up_path.append(pred[0][up_path[-1]])
+        up_path.reverse()
+        down_path = [meet]
+        while down_path[-1] != target:
+            down_path.append(pred[1][down_path[-1]])
+        path = up_path + down_path[1:]
+        route = [source]
+        for u, w in zip(path, path[1:]):
+            route.extend(self._unpack(u, w))
+        return best, route
+
+    def _unpack(self, u, w):
+        """Return the original nodes after u on edge u -> w (shortcuts expanded, iteratively)."""
+        nodes = []
+        stack = [(u, w)]
+        while stack:
+            a, b = stack.pop()
+            m = self.middle.get((a, b))
+            if m is None:
+                nodes.append(b)
+            else:
+                stack.append((m, b))
+                stack.append((a, m))
+        return nodes
+
+
+def _witness_search(out, source, skip, limit, settle_limit):
+    """Dijkstra from `source` that avoids `skip`, stops past `limit` or after `settle_limit` nodes."""
+    dist = {source: 0}
+    queue = LazyHeap()
+    queue.push(source, 0)
+    settled = 0
+    while queue and settled < settle_limit:
+        u, d = queue.pop()
+        if d > limit:
+            break
+        settled += 1
+        for v, weight in out[u].items():
+            if v == skip:
+                continue
+            candidate = d + weight
+            if candidate < dist.get(v, math.inf):
+                dist[v] = candidate
+                queue.push(v, candidate)
+    return dist
+
+
+def benchmark(graph, hierarchy=None, queries=100, seed=0):
+    """Time random point-to-point queries with the CH and with dijkstra_city_distance.
+
+    Checks every CH distance against Dijkstra and returns a dict of timings.
+    Without `hierarchy` the CH is built here and the build is timed as
+    preprocess_seconds (None when a prebuilt hierarchy is passed in).
+    """
+    nodes = list(graph.nodes)
+    rng = random.Random(seed)
+    pairs = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(queries)]
+
+    preprocess = None
+    if hierarchy is None:
+        started = time.perf_counter()
+        hierarchy = ContractionHierarchy.build(graph)
+        preprocess = time.perf_counter() - started
+
+    started = time.perf_counter()
+    expected = [dijkstra_city_distance(graph, s)[0].get(t, math.inf) for s, t in pairs]
+    dijkstra_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    answers = [hierarchy.query(s, t)[0] for s, t in pairs]
+    ch_time = time.perf_counter() - started
+
+    mismatches = sum(1 for a, b in zip(answers, expected) if a != b)
+    return {
+        "queries": queries,
+        "preprocess_seconds": preprocess,
+        "shortcuts": hierarchy.shortcut_count(),
+        "dijkstra_ms_per_query": 1000 * dijkstra_time / queries,
+        "ch_ms_per_query": 1000 * ch_time / queries,
+        "speedup": dijkstra_time / ch_time if ch_time else math.inf,
+        "mismatches": mismatches,
+    }
+
+
+def main():
+    """Preprocess the city graph, answer a query and compare against Dijkstra."""
+    g = build_city_graph()
+    ch = ContractionHierarchy.build(g)
+    distance, path = ch.query('Seattle', 'Miami')
+    print(f"Seattle to Miami: {distance} via {' to '.join(path)}")
+    for name, value in benchmark(g, queries=200).items():
+        print(f"  {name}: {value:.4f}" if isinstance(value, float) else f"  {name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
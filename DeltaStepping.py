@@ -0,0 +1,262 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+from CSRGraph import CSRGraph
+from Dijkstra import dijkstra
+from GraphGenerators import build_graph, generate
+from SharedArrays import init_worker, release, share, worker
+from ShortestDistanceCity import build_city_graph
+
+try:
+    import numpy as np  # Optional: vectorized bucket relaxation
+except ImportError:
+    np = None
+
+# #########################
+#
+#  Delta-stepping single-source shortest paths
+#
+# #########################
+# Dijkstra settles one node at a time. Delta-stepping (Meyer & Sanders) settles
+# a whole bucket of nodes whose distances lie in [i * delta, (i + 1) * delta):
+#   - light edges (weight <= delta) can land back in the current bucket, so the
+#     bucket is relaxed in rounds until no node re-enters it;
+#   - heavy edges (weight > delta) always land in a later bucket, so they are
+#     relaxed once, after the bucket is settled.
+# Every round relaxes all edges of a frontier at once: with NumPy that is a
+# handful of array operations over the CSR arrays, and with workers > 1 large
+# frontiers are split across a process pool that maps the arrays from shared
+# memory. Without NumPy a pure-Python version with set buckets is used.
+
+PARALLEL_EDGES = 1 << 16  # Smallest frontier (in edges) worth sending to the pool
+
+
+def delta_stepping(graph, source, delta=None, workers=1, use_numpy=None):
+    """Return (distances, predecessors) from `source`, in the same form as Dijkstra.dijkstra.
+
+    `graph` is a Graph or CSRGraph. `delta` is the bucket width (default: the
+    mean edge weight). `workers` > 1 shards large frontiers across that many
+    processes (None: one per CPU; needs NumPy). use_numpy=False forces the
+    pure-Python version. Distances are identical to dijkstra; where several
+    shortest paths exist the predecessor may differ but is always on one.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    s = csr.index.get(source)
+    if s is None:
+        return {source: 0}, {}
+    if use_numpy is None:
+        use_numpy = np is not None
+    if delta is None:
+        delta = sum(csr.weights) / len(csr.weights) if len(csr.weights) else 1
+    delta = max(delta, 1e-12)
+
+    if use_numpy:
+        if np is None:
+            raise ImportError("delta_stepping(use_numpy=True) requires NumPy")
+        dist, pred = _delta_numpy(csr, s, delta, workers)
+        integral = np.issubdtype(np.asarray(memoryview(csr.weights)).dtype, np.integer)
+        reached = np.flatnonzero(np.isfinite(dist))
+        values = dist[reached].astype(np.int64) if integral else dist[reached]
+        labels = csr.labels
+        distances = dict(zip((labels[i] for i in reached.tolist()), values.tolist()))
+        parents = {labels[i]: labels[p] for i, p in zip(reached.tolist(), pred[reached].tolist()) if p >= 0}
+        return distances, parents
+
+    dist, pred = _delta_python(csr.offsets, csr.targets, csr.weights, s, delta)
+    labels = csr.labels
+    distances = {labels[i]: d for i, d in enumerate(dist) if d != math.inf}
+    parents = {labels[i]: labels[p] for i, p in enumerate(pred) if p >= 0}
+    return distances, parents
+
+
+# #########################
+#  Pure-Python version
+# #########################
+def _delta_python(offsets, targets, weights, source, delta):
+    """Delta-stepping over raw CSR arrays with dict-of-set buckets; returns (dist, pred) lists."""
+    n = len(offsets) - 1
+    dist = [math.inf] * n
+    pred = [-1] * n
+    dist[source] = 0
+    buckets = {0: {source}}
+    order = [0]  # Min-heap of bucket indices (an index may repeat or point at an emptied bucket)
+
+    def relax(u, v, d):
+        if d < dist[v]:
+            if dist[v] != math.inf:
+                buckets.get(int(dist[v] // delta), set()).discard(v)
+            dist[v] = d
+            pred[v] = u
+            i = int(d // delta)
+            if i not in buckets:
+                buckets[i] = set()
+                heappush(order, i)
+            buckets[i].add(v)
+
+    while order:
+        i = heappop(order)
+        settled = set()
+        # Light edges: repeat until the bucket stays empty
+        while buckets.get(i):
+            frontier = buckets.pop(i)
+            settled |= frontier
+            for u in frontier:
+                d = dist[u]
+                for k in range(offsets[u], offsets[u + 1]):
+                    if weights[k] <= delta:
+                        relax(u, targets[k], d + weights[k])
+        buckets.pop(i, None)
+        # Heavy edges: once per settled node
+        for u in settled:
+            d = dist[u]
+            for k in range(offsets[u], offsets[u + 1]):
+                if weights[k] > delta:
+                    relax(u, targets[k], d + weights[k])
+    return dist, pred
+
+
+# #########################
+#  NumPy version
+# #########################
+def _frontier_edges(offsets, targets, weights, nodes, node_dist, light, delta):
+    """Return (target, candidate distance, source) of the light or heavy edges leaving `nodes`."""
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, np.empty(0), empty
+    # Edge ids of every node laid end to end
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    edges = np.repeat(starts - first, counts) + np.arange(total)
+    w = weights[edges]
+    keep = w <= delta if light else w > delta
+    edges, w = edges[keep], w[keep]
+    sources = np.repeat(np.arange(len(nodes)), counts)[keep]
+    return targets[edges], np.repeat(node_dist, counts)[keep] + w, nodes[sources]
+
+
+def _best_per_target(tgt, candidate, src):
+    """Keep the smallest candidate for every target (ties: the first edge)."""
+    if len(tgt) == 0:
+        return tgt, candidate, src
+    order = np.lexsort((candidate, tgt))
+    tgt, candidate, src = tgt[order], candidate[order], src[order]
+    first = np.ones(len(tgt), dtype=bool)
+    first[1:] = tgt[1:] != tgt[:-1]
+    return tgt[first], candidate[first], src[first]
+
+
+def _delta_numpy(csr, source, delta, workers):
+    offsets, targets, weights = (np.asarray(a) for a in csr.to_numpy())
+    offsets = offsets.astype(np.int64, copy=False)
+    targets = targets.astype(np.int64, copy=False)
+    weights = weights.astype(np.float64)
+    n = len(offsets) - 1
+    dist = np.full(n, np.inf)
+    pred = np.full(n, -1, dtype=np.int64)
+    dist[source] = 0
+    settled = np.zeros(n, dtype=bool)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = blocks = None
+    if workers > 1:
+        blocks = share([offsets, targets, weights])
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                   initargs=([b.name for b in blocks], [len(offsets), len(targets), len(weights)],
+                                             ["q", "q", "d"]))
+
+    def relax(nodes, light):
+        """Relax the light or heavy edges of `nodes`; returns the nodes whose distance dropped."""
+        node_dist = dist[nodes]
+        size = int((offsets[nodes + 1] - offsets[nodes]).sum())
+        if pool is not None and size >= PARALLEL_EDGES:
+            parts = [pool.submit(_relax_shard, chunk, dist[chunk], light, delta)
+                     for chunk in np.array_split(nodes, workers)]
+            pieces = [part.result() for part in parts]
+            tgt, candidate, src = (np.concatenate(column) for column in zip(*pieces))
+        else:
+            tgt, candidate, src = _frontier_edges(offsets, targets, weights, nodes, node_dist, light, delta)
+        tgt, candidate, src = _best_per_target(tgt, candidate, src)
+        better = candidate < dist[tgt]
+        tgt = tgt[better]
+        dist[tgt] = candidate[better]
+        pred[tgt] = src[better]
+        return tgt
+
+    # Nodes are filed under the bucket of the distance they had when it dropped;
+    # entries go stale when it drops again and are filtered out when the bucket is taken
+    buckets = {}  # bucket index -> arrays of node ids
+    order = []  # Min-heap of the bucket indices in `buckets`
+
+    def bucket_of(nodes):
+        return np.floor(dist[nodes] / delta).astype(np.int64)
+
+    def enter(nodes):
+        if len(nodes) == 0:
+            return
+        index = bucket_of(nodes)
+        low, high = int(index.min()), int(index.max())
+        if low == high:
+            groups = [(low, nodes)]
+        else:
+            by_bucket = np.argsort(index, kind="stable")
+            nodes, index = nodes[by_bucket], index[by_bucket]
+            starts = np.flatnonzero(index[1:] != index[:-1]) + 1
+            groups = zip(index[np.concatenate(([0], starts))].tolist(), np.split(nodes, starts))
+        for i, group in groups:
+            if i not in buckets:
+                buckets[i] = []
+                heappush(order, i)
+            buckets[i].append(group)
+
+    try:
+        enter(np.array([source], dtype=np.int64))
+        while order:
+            i = heappop(order)
+            frontier = np.unique(np.concatenate(buckets.pop(i)))
+            frontier = frontier[~settled[frontier] & (bucket_of(frontier) == i)]
+            bucket = [frontier]
+            while len(frontier):
+                improved = relax(frontier, light=True)
+                inside = bucket_of(improved) == i
+                enter(improved[~inside])
+                frontier = np.unique(improved[inside])
+                bucket.append(frontier)
+            members = np.unique(np.concatenate(bucket))
+            settled[members] = True
+            enter(relax(members, light=False))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+            release(blocks)
+    return dist, pred
+
+
+def _relax_shard(nodes, node_dist, light, delta):
+    offsets, targets, weights = (np.asarray(a) for a in worker["arrays"])
+    return _best_per_target(*_frontier_edges(offsets, targets, weights, nodes, node_dist, light, delta))
+
+
+def main():
+    """Check delta-stepping against Dijkstra on the city graph and time it on a generated grid."""
+    g = build_city_graph()
+    distances, parents = delta_stepping(g, 'Denver')
+    print(f"City graph from Denver matches dijkstra: {distances == dijkstra(g, 'Denver')[0]}")
+
+    grid = build_graph(generate("grid", 400_000, seed=1), csr=True)
+    for name, run in [("dijkstra", lambda: dijkstra(grid, 0)),
+                      ("delta-stepping (Python)", lambda: delta_stepping(grid, 0, use_numpy=False)),
+                      ("delta-stepping (NumPy)", lambda: delta_stepping(grid, 0))]:
+        if name.endswith("(NumPy)") and np is None:
+            continue
+        started = time.perf_counter()
+        distances = run()[0]
+        print(f"{name}: {len(distances)} nodes in {time.perf_counter() - started:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from collections import defaultdict
+from PriorityQueues import make_queue
+from SearchTracer import Tracer, SearchStats, MultiTracer
 
 # Graph class to represent a directed graph
 # Referenced module 17 slide 16
@@ -10,35 +12,101 @@ class Graph:
         self.edges = defaultdict(list)
         # Dictionary to store distances between nodes, used for edge weights
         self.distances = {}
+        # Bumped on every change, so cached results (PathCache.py) know when they are stale
+        self.version = 0
 
     # Add a node to the graph
     def add_node(self, value):
-        self.nodes.add(value)
+        if value not in self.nodes:
+            self.nodes.add(value)
+            self.version += 1
 
-    # Add a directed edge with a weight
+    # Add a directed edge with a weight (adding it again just changes the weight)
     def add_edge(self, from_node, to_node, distance):
-        self.edges[from_node].append(to_node)
+        if (from_node, to_node) not in self.distances or to_node not in self.edges[from_node]:
+            self.edges[from_node].append(to_node)
         self.distances[(from_node, to_node)] = distance
+        self.version += 1
+
+    # Add many directed edges at once, adding their end nodes too (used by the bulk
+    # loaders in GraphLoader.py): one version bump per batch instead of per edge
+    def add_edges(self, edges):
+        edges_out, distances, nodes = self.edges, self.distances, self.nodes
+        for from_node, to_node, distance in edges:
+            if (from_node, to_node) not in distances or to_node not in edges_out[from_node]:
+                edges_out[from_node].append(to_node)
+            distances[(from_node, to_node)] = distance
+            nodes.add(from_node)
+            nodes.add(to_node)
+        self.version += 1
+
+    # Remove a directed edge
+    def remove_edge(self, from_node, to_node):
+        self.edges[from_node].remove(to_node)
+        del self.distances[(from_node, to_node)]
+        self.version += 1
+
+    # Yield (neighbor, distance) for every outgoing edge of a node
+    # (CSRGraph offers the same method, so the algorithms accept either graph)
+    def neighbors(self, node):
+        for to_node in self.edges.get(node, ()):
+            yield to_node, self.distances[(node, to_node)]
+
+
+# Prints every step of the search, as the original dijkstra did
+class RelaxationPrinter(Tracer):
+    def on_start(self, source, dist, pred):
+        self.visited = dist
+        self.path = pred
+        print("Starting Dijkstra's algorithm...\n--------------------------------\n")
+
+    def on_settle(self, node, distance):
+        print(f"Node({node}) with Weight: {distance} is added to the 'Visited' {list(self.visited.keys())}")
+
+    def on_relax(self, node, neighbor, old, new):
+        print(f"Relaxed: vertex[{neighbor}]: OLD: {'Infinity' if old is None else old}, NEW: {new}, PATHS: {self.path}")
+
+    def on_skip(self, node, neighbor, distance):
+        print(f"No edge relaxation is needed for node [{neighbor}]\n")
 
 
 # Dijkstra's algorithm to compute the shortest paths from a start node
-def dijkstra(graph, start):
+# `queue` selects how the next node is picked: "scan" checks every unvisited node
+# (O(V^2)), while "heap", "dary" and "pairing" use a priority queue (O(E log V)).
+# The search is silent; pass a `tracer` (see SearchTracer.py) to print or count its steps.
+def dijkstra(graph, start, queue="heap", tracer=None):
     # Dictionary to store the shortest distance from the start node to each node
     visited = {start: 0}
     # Dictionary to store the path (i.e., predecessor of each node)
     path = {}
     # Set of unvisited nodes
     nodes = set(graph.nodes)
-
-    print("Starting Dijkstra's algorithm...\n--------------------------------\n")
+    # Priority queue of reached but unvisited nodes (None when scanning)
+    pq = None if queue == "scan" else make_queue(queue)
+
+    if tracer is not None:
+        tracer.on_start(start, visited, path)
+    if pq is not None:
+        pq.push(start, 0)
+        if tracer is not None:
+            tracer.on_push(start, 0)
     
     # Loop until all nodes have been visited or there are no nodes to visit
     while nodes:
         # Find the node with the smallest distance from the visited nodes
         min_node = None
-        for node in nodes:
-            if node in visited:
-                if min_node is None or visited[node] < visited[min_node]:
+        if pq is None:
+            for node in nodes:
+                if node in visited:
+                    if min_node is None or visited[node] < visited[min_node]:
+                        min_node = node
+        else:
+            # Pop until an unvisited node comes out (nodes outside graph.nodes are never expanded)
+            while pq and min_node is None:
+                node, priority = pq.pop()
+                if tracer is not None:
+                    tracer.on_pop(node, priority)
+                if node in nodes:
                     min_node = node
 
         # If no node can be selected, exit the loop (this means there are no connected nodes left)
@@ -48,21 +116,29 @@ def dijkstra(graph, start):
         # Remove the selected node from unvisited nodes
         nodes.remove(min_node)
         current_weight = visited[min_node]
-        print(f"Node({min_node}) with Weight: {current_weight} is added to the 'Visited' {list(visited.keys())}")
+        if tracer is not None:
+            tracer.on_settle(min_node, current_weight)
 
         # Check all neighboring nodes of the selected node
-        for neighbor in graph.edges[min_node]:
+        for neighbor, distance in graph.neighbors(min_node):
             # Calculate the new distance (current node's distance + edge weight)
-            weight = current_weight + graph.distances[(min_node, neighbor)]
+            weight = current_weight + distance
             
             # Relaxation step: Update distance if a shorter path is found
             if neighbor not in visited or weight < visited[neighbor]:
-                print(f"Relaxed: vertex[{neighbor}]: OLD: {visited.get(neighbor, 'Infinity')}, NEW: {weight}, PATHS: {path}")
+                if tracer is not None:
+                    tracer.on_relax(min_node, neighbor, visited.get(neighbor), weight)
                 visited[neighbor] = weight  # Update shortest distance for the neighbor
                 path[neighbor] = min_node   # Update the predecessor of the neighbor (i.e., the current node)
-            else:
-                print(f"No edge relaxation is needed for node [{neighbor}]\n")
-
+                if pq is not None:
+                    pq.push(neighbor, weight)  # Queue the neighbor (or lower its priority)
+                    if tracer is not None:
+                        tracer.on_push(neighbor, weight)
+            elif tracer is not None:
+                tracer.on_skip(min_node, neighbor, visited[neighbor])
+
+    if tracer is not None:
+        tracer.on_finish()
     # Return the shortest distances and paths
     return visited, path
 
@@ -84,11 +160,11 @@ def main():
         ('E', 'H', 2), ('E', 'I', 3), ('F', 'I', 1), ('F', 't', 3),
         ('G', 'H', 6), ('H', 'I', 6), ('I', 't', 4)
     ]
-    for from_node, to_node, distance in edges:
-        ConstructGraph.add_edge(from_node, to_node, distance)
+    ConstructGraph.add_edges(edges)
 
     # Running Dijkstra's Algorithm from the start node 's'
-    visited, path = dijkstra(ConstructGraph, 's')
+    stats = SearchStats()
+    visited, path = dijkstra(ConstructGraph, 's', tracer=MultiTracer(RelaxationPrinter(), stats))
 
     # Displaying Final Results
     print("\nFinal Shortest Path Results: \n----------------------------")
@@ -109,6 +185,9 @@ def main():
         total_weight += distance
     print(f"Total Weight: {total_weight}")    
 
+    # Display how much work the search did
+    print(f"\nSearch Statistics: {stats}")
+
 # Entry point of the script
 if __name__ == "__main__":
     main()
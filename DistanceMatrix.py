@@ -0,0 +1,101 @@
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappush, heappop
+from CSRGraph import CSRGraph
+from SharedArrays import init_worker, release, share, worker
+from ShortestDistanceCity import build_city_graph
+
+try:
+    import numpy as np  # Optional: results come back as a NumPy matrix when available
+except ImportError:
+    np = None
+
+# #########################
+#
+#  Many-to-many distance matrix
+#
+# #########################
+# One Dijkstra run per source, fanned out over a process pool. The graph is
+# converted to CSR once and its three arrays are copied into shared memory;
+# every worker maps them at start-up (the node labels are sent once per worker),
+# so a task is only a source id and a result row.
+
+
+def sssp_ids(offsets, targets, weights, source):
+    """Dijkstra over raw CSR arrays using node ids; returns the distance list (math.inf if unreachable)."""
+    dist = [math.inf] * (len(offsets) - 1)
+    dist[source] = 0
+    heap = [(0, source)]
+    while heap:
+        d, u = heappop(heap)
+        if d > dist[u]:
+            continue  # Stale entry
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            candidate = d + weights[k]
+            if candidate < dist[v]:
+                dist[v] = candidate
+                heappush(heap, (candidate, v))
+    return dist
+
+
+def _row(source_id):
+    offsets, targets, weights = worker["arrays"]
+    dist = sssp_ids(offsets, targets, weights, source_id)
+    return [dist[t] for t in worker["targets"]]
+
+
+def distance_matrix(graph, sources, targets=None, workers=None):
+    """Return the |sources| x |targets| matrix of shortest distances (math.inf if unreachable).
+
+    `graph` is a Graph or CSRGraph; `targets` defaults to `sources`. Rows are
+    computed in `workers` processes (default: one per CPU; 1 runs in-process).
+    The result is a NumPy float64 array, or a list of lists without NumPy.
+    """
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    sources = list(sources)
+    targets = sources if targets is None else list(targets)
+    source_ids = [csr.index[s] for s in sources]
+    target_ids = [csr.index[t] for t in targets]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(source_ids)))
+
+    if workers == 1:
+        rows = []
+        for s in source_ids:
+            dist = sssp_ids(csr.offsets, csr.targets, csr.weights, s)
+            rows.append([dist[t] for t in target_ids])
+    else:
+        arrays = [array("q", csr.offsets), array("q", csr.targets),
+                  csr.weights if isinstance(csr.weights, array) else array("d", csr.weights)]
+        blocks = share(arrays)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                                     initargs=([b.name for b in blocks], [len(a) for a in arrays],
+                                               [a.typecode for a in arrays], {"targets": target_ids})) as pool:
+                chunksize = max(1, len(source_ids) // (4 * workers))
+                rows = list(pool.map(_row, source_ids, chunksize=chunksize))
+        finally:
+            release(blocks)
+
+    if np is None:
+        return rows
+    return np.array(rows, dtype=np.float64).reshape(len(sources), len(targets))
+
+
+def main():
+    """Print the depot x customer distance matrix for a few cities."""
+    g = build_city_graph()
+    depots = ['Denver', 'Chicago', 'Atlanta']
+    customers = ['Seattle', 'Miami', 'Boston', 'Phoenix']
+    matrix = distance_matrix(g, depots, customers, workers=2)
+    print(f"{'':>10}" + "".join(f"{c:>10}" for c in customers))
+    for depot, row in zip(depots, matrix):
+        print(f"{depot:>10}" + "".join(f"{d:>10.0f}" for d in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import math
+import random
+from collections import defaultdict
+from Dijkstra import dijkstra
+from PriorityQueues import make_queue
+from ShortestDistanceCity import build_city_graph
+
+# #########################
+#
+#  Dynamic single-source shortest paths
+#
+# #########################
+# Keeps the shortest-path tree of one source up to date while edges change,
+# in the style of Ramalingam & Reps: only the part of the tree that depends on
+# a changed edge is recomputed.
+#   - An edge that gets heavier (or disappears) matters only if it is a tree
+#     edge; its whole subtree loses its distances and is re-attached from the
+#     best incoming edge of the rest of the tree.
+#   - An edge that gets lighter (or appears) matters only if it improves its
+#     head; the improvement is propagated like an ordinary Dijkstra search.
+
+
+class DynamicShortestPaths:
+    """Shortest distances and predecessors from `source`, repaired after each batch of edge changes."""
+
+    def __init__(self, graph, source, dist=None, pred=None, queue="heap"):
+        """`dist`/`pred` may come from dijkstra or dijkstra_city_distance; they are computed if omitted.
+
+        `graph` must support add_edge / remove_edge (Dijkstra.Graph or ShortestDistanceCity.Graph).
+        """
+        self.graph = graph
+        self.source = source
+        self.queue = queue
+        if dist is None:
+            dist, pred = dijkstra(graph, source)
+        self.dist = dict(dist)
+        # Same format as dijkstra: no entry for the source or unreached nodes
+        self.pred = {v: p for v, p in pred.items() if v != source and p != "" and v in self.dist}
+        self.children = defaultdict(set)  # Tree edges the other way round
+        for v, p in self.pred.items():
+            self.children[p].add(v)
+        self.before = {}
+        self.incoming = defaultdict(dict)  # incoming[v][u] = weight of u -> v
+        for u in list(graph.edges):
+            for v, distance in graph.neighbors(u):
+                self.incoming[v][u] = distance
+
+    def apply(self, changes):
+        """Apply a batch of (from_node, to_node, distance) changes and repair the tree.
+
+        distance=None deletes the edge; otherwise the edge is inserted or its
+        weight updated. Returns the set of nodes whose distance changed.
+        """
+        dist, pred = self.dist, self.pred
+        cut = []  # Heads of tree edges that got heavier or were removed
+        improved = []  # Edges that may shorten a route
+
+        for u, v, distance in changes:
+            old = self.incoming[v].get(u)
+            if distance is None:
+                if old is None:
+                    continue
+                self.graph.remove_edge(u, v)
+                del self.incoming[v][u]
+            else:
+                self.graph.add_edge(u, v, distance)
+                self.incoming[v][u] = distance
+            if old is not None and (distance is None or distance > old):
+                if pred.get(v) == u:
+                    cut.append(v)
+            elif distance is not None:
+                improved.append((u, v))
+
+        self.before = {}  # Old distance of every node touched by this batch
+
+        # Every node below a cut tree edge loses its distance
+        affected = set()
+        stack = [v for v in cut if v in dist]
+        while stack:
+            x = stack.pop()
+            if x in affected:
+                continue
+            affected.add(x)
+            stack.extend(self.children.get(x, ()))
+        for x in affected:
+            self.before[x] = dist.pop(x)
+            self._set_parent(x, None)
+
+        pq = make_queue(self.queue)
+        # Re-attach the affected nodes through their best edge from the intact tree
+        for x in affected:
+            for u, distance in self.incoming[x].items():
+                if u in dist and u not in affected:
+                    self._relax(u, x, dist[u] + distance, pq)
+        # Seed the improvements (skipping edges removed later in the same batch)
+        for u, v in improved:
+            distance = self.incoming[v].get(u)
+            if u in dist and distance is not None:
+                self._relax(u, v, dist[u] + distance, pq)
+
+        # Propagate the new distances (Dijkstra restricted to nodes that change)
+        while pq:
+            x, d = pq.pop()
+            if d > dist.get(x, math.inf):
+                continue
+            for y, distance in self.graph.neighbors(x):
+                self._relax(x, y, d + distance, pq)
+
+        return {v for v, old in self.before.items() if dist.get(v) != old}
+
+    def _relax(self, u, v, weight, pq):
+        if v != self.source and weight < self.dist.get(v, math.inf):
+            self.before.setdefault(v, self.dist.get(v))
+            self.dist[v] = weight
+            self._set_parent(v, u)
+            pq.push(v, weight)
+
+    def _set_parent(self, v, u):
+        """Point v's tree edge at u (None detaches it), keeping `children` in sync."""
+        old = self.pred.pop(v, None)
+        if old is not None:
+            self.children[old].discard(v)
+        if u is not None:
+            self.pred[v] = u
+            self.children[u].add(v)
+
+    def verify(self):
+        """Recompute from scratch and return True if the distances match."""
+        return dijkstra(self.graph, self.source)[0] == self.dist
+
+
+def main():
+    """Apply random traffic updates to the city graph and check every repair against a full recompute."""
+    g = build_city_graph()
+    tracker = DynamicShortestPaths(g, 'Denver')
+    rng = random.Random(3412)
+    roads = list(g.distances)
+    for batch in range(1, 6):
+        changes = []
+        for u, v in rng.sample(roads, 4):
+            if rng.random() < 0.2:
+                changes.append((u, v, None))
+                roads.remove((u, v))
+            else:
+                changes.append((u, v, max(1, int(g.distances[(u, v)] * rng.uniform(0.5, 1.5)))))
+        changed = tracker.apply(changes)
+        print(f"Batch {batch}: {len(changes)} edge updates changed {len(changed)} distances, "
+              f"matches full recompute: {tracker.verify()}")
+
+
+if __name__ == "__main__":
+    main()
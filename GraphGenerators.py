@@ -0,0 +1,137 @@
+import math
+import random
+from itertools import islice
+from CSRGraph import CSRGraph
+from ShortestDistanceCity import Graph
+
+# #########################
+#
+#  Synthetic graph generators
+#
+# #########################
+# Seeded generators for benchmarking at sizes well beyond the demo graphs.
+# Each one yields (from_node, to_node, distance) triples with integer node
+# labels 0..V-1; every road is emitted in both directions, so the graphs also
+# suit the MST code.
+#   grid       2D grid road network (4 neighbors, random weights)
+#   geometric  random geometric graph: points in the unit square joined when
+#              closer than a radius picked for the requested average degree
+#   powerlaw   Barabasi-Albert preferential attachment (a few hubs, many
+#              low-degree nodes)
+
+
+def grid_edges(rows, cols, max_weight=100, seed=0):
+    """Yield the edges of a rows x cols grid; node r * cols + c, weights 1..max_weight."""
+    rng = random.Random(seed)
+    for r in range(rows):
+        for c in range(cols):
+            u = r * cols + c
+            if c + 1 < cols:
+                w = rng.randint(1, max_weight)
+                yield u, u + 1, w
+                yield u + 1, u, w
+            if r + 1 < rows:
+                w = rng.randint(1, max_weight)
+                yield u, u + cols, w
+                yield u + cols, u, w
+
+
+def geometric_edges(nodes, degree=6, scale=1000, seed=0):
+    """Yield the edges of a random geometric graph with about `degree` neighbors per node.
+
+    Weights are the Euclidean distances times `scale`, rounded (at least 1).
+    Points are bucketed into cells one radius wide, so only nearby pairs are compared.
+    """
+    rng = random.Random(seed)
+    points = [(rng.random(), rng.random()) for _ in range(nodes)]
+    radius = math.sqrt(degree / (math.pi * max(nodes, 1)))
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(i)
+
+    for (cx, cy), members in cells.items():
+        # This cell and the four "forward" neighbor cells, so each pair is seen once
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            others = cells.get((cx + dx, cy + dy))
+            if others is None:
+                continue
+            for i in members:
+                xi, yi = points[i]
+                for j in others:
+                    if (dx, dy) == (0, 0) and j <= i:
+                        continue
+                    d = math.hypot(xi - points[j][0], yi - points[j][1])
+                    if d <= radius:
+                        w = max(1, round(d * scale))
+                        yield i, j, w
+                        yield j, i, w
+
+
+def power_law_edges(nodes, attach=3, max_weight=100, seed=0):
+    """Yield the edges of a Barabasi-Albert graph: each new node links to `attach` earlier ones.
+
+    Targets are drawn in proportion to their degree, from a list holding each
+    node once per edge end.
+    """
+    rng = random.Random(seed)
+    core = min(nodes, attach + 1)
+    ends = []
+    for u in range(core):  # Start from a small clique
+        for v in range(u + 1, core):
+            w = rng.randint(1, max_weight)
+            yield u, v, w
+            yield v, u, w
+            ends.extend((u, v))
+    for u in range(core, nodes):
+        targets = set()
+        while len(targets) < min(attach, u):
+            targets.add(rng.choice(ends) if ends else rng.randrange(u))
+        for v in sorted(targets):
+            w = rng.randint(1, max_weight)
+            yield u, v, w
+            yield v, u, w
+            ends.extend((u, v))
+
+
+GENERATORS = {
+    "grid": grid_edges,
+    "geometric": geometric_edges,
+    "powerlaw": power_law_edges,
+}
+
+
+def generate(kind, edges, seed=0):
+    """Yield a `kind` graph with about `edges` directed edges (10**3 .. 10**7 and beyond)."""
+    if kind == "grid":
+        side = max(2, round(math.sqrt(edges / 4)))  # ~4 directed edges per node
+        return grid_edges(side, side, seed=seed)
+    if kind == "geometric":
+        return geometric_edges(max(2, edges // 6), degree=6, seed=seed)
+    if kind == "powerlaw":
+        return power_law_edges(max(2, edges // 6), attach=3, seed=seed)
+    raise ValueError(f"Unknown graph kind {kind!r}; expected one of {sorted(GENERATORS)}")
+
+
+def build_graph(edges, csr=False, batch_size=100_000):
+    """Collect generated edges into a Graph (batched add_edges) or, with csr=True, a CSRGraph."""
+    if csr:
+        return CSRGraph.from_edges(edges)
+    graph = Graph()
+    edges = iter(edges)
+    while True:
+        batch = list(islice(edges, batch_size))
+        if not batch:
+            return graph
+        graph.add_edges(batch)
+
+
+def main():
+    """Print the size of each kind of generated graph at a few scales."""
+    for kind in GENERATORS:
+        for edges in (10 ** 3, 10 ** 4, 10 ** 5):
+            graph = build_graph(generate(kind, edges), csr=True)
+            print(f"{kind:>10} target {edges:>7} edges: {graph}")
+
+
+if __name__ == "__main__":
+    main()
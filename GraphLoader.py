@@ -0,0 +1,274 @@
+import csv
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from itertools import islice
+from CSRGraph import CSRGraph
+from ShortestDistanceCity import Graph
+
+# #########################
+#
+#  Bulk graph loading
+#
+# #########################
+# Edge files are read as a stream of (from_node, to_node, distance) rows and
+# handed to the graph in batches (Graph.add_edges), or packed straight into a
+# CSRGraph. A CSRGraph can then be saved as a binary snapshot whose arrays are
+# memory-mapped back on the next start: nothing is parsed or copied, the
+# operating system pages the edges in as the searches touch them.
+#
+# Supported edge files:
+#   .csv / .tsv   from_node, to_node, distance (an optional header row is skipped)
+#   .gr           DIMACS shortest-path format ("a u v w" arc lines, integer node ids)
+#
+# Snapshot layout (little-endian):
+#   header    magic "CSRS", format version, label kind, weight typecode,
+#             node count, edge count, first label, label bytes
+#   offsets   (nodes + 1) int64
+#   targets   edges int64
+#   weights   edges int64 or float64
+#   labels    JSON list of labels (empty when the labels are first, first+1, ...)
+
+SNAPSHOT_MAGIC = b"CSRS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sHBcQQqQ")
+LABELS_RANGE = 0  # Labels are the integers first .. first + nodes - 1 (DIMACS ids)
+LABELS_JSON = 1
+BATCH_SIZE = 100_000
+
+
+# #########################
+#  Edge readers
+# #########################
+def _number(text):
+    """Parse a weight, keeping integers as int."""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def read_csv_edges(path, delimiter=None, columns=(0, 1, 2), node_type=str):
+    """Yield (from_node, to_node, distance) rows of a delimited edge file.
+
+    The delimiter defaults to a tab for .tsv files and a comma otherwise. Blank
+    rows and rows starting with "#" are skipped, and so is the first remaining
+    row if its distance column is not a number (a header).
+    Node labels are converted with `node_type`.
+    """
+    if delimiter is None:
+        delimiter = "\t" if path.endswith(".tsv") else ","
+    u_col, v_col, w_col = columns
+    with open(path, newline="") as file:
+        rows = csv.reader(file, delimiter=delimiter)
+        first_data_row = True
+        for row in rows:
+            if not row or row[0].startswith("#"):
+                continue
+            header_allowed, first_data_row = first_data_row, False
+            try:
+                distance = _number(row[w_col])
+            except ValueError:
+                if header_allowed:
+                    continue  # Header row
+                # line_num counts file lines, so quoted fields with newlines still point at the right one
+                raise ValueError(f"{path}:{rows.line_num}: bad distance {row[w_col]!r}") from None
+            yield node_type(row[u_col]), node_type(row[v_col]), distance
+
+
+def read_dimacs_edges(path):
+    """Yield (from_node, to_node, distance) for the arc lines of a DIMACS .gr file.
+
+    Node ids stay integers (1-based in DIMACS files).
+    """
+    with open(path) as file:
+        for line in file:
+            if line.startswith("a "):
+                _, u, v, w = line.split()
+                yield int(u), int(v), _number(w)
+
+
+def dimacs_node_count(path):
+    """Return the node count from the "p sp <nodes> <arcs>" line of a DIMACS file, or None."""
+    with open(path) as file:
+        for line in file:
+            if line.startswith("p "):
+                return int(line.split()[2])
+            if line.startswith("a "):
+                break
+    return None
+
+
+def read_edges(path):
+    """Yield the edges of `path`, choosing the reader from its extension."""
+    if path.endswith(".gr"):
+        return read_dimacs_edges(path)
+    return read_csv_edges(path)
+
+
+# #########################
+#  Loaders
+# #########################
+def load_graph(path, graph=None, batch_size=BATCH_SIZE):
+    """Stream an edge file into a Graph (a new ShortestDistanceCity.Graph by default).
+
+    Rows go in via graph.add_edges in batches of `batch_size`, so the file is
+    never held in memory and the graph's version changes once per batch.
+    """
+    if graph is None:
+        graph = Graph()
+    edges = read_edges(path)
+    while True:
+        batch = list(islice(edges, batch_size))
+        if not batch:
+            return graph
+        graph.add_edges(batch)
+
+
+def load_csr(path):
+    """Read an edge file straight into a CSRGraph (no dict-based Graph in between).
+
+    DIMACS node ids become node ids 0..V-1 in order, including isolated ids.
+    Repeated rows stay parallel edges (a Graph keeps only the last weight).
+    """
+    nodes = ()
+    if path.endswith(".gr"):
+        count = dimacs_node_count(path)
+        if count is not None:
+            nodes = range(1, count + 1)
+    return CSRGraph.from_edges(read_edges(path), nodes)
+
+
+# #########################
+#  Binary snapshots
+# #########################
+def save_snapshot(graph, path):
+    """Write a Graph or CSRGraph to `path` as a snapshot for load_snapshot."""
+    csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    labels = csr.labels
+    first = labels[0] if labels and isinstance(labels[0], int) else 0
+    if isinstance(labels, range) or all(type(label) is int and label == first + i for i, label in enumerate(labels)):
+        kind, label_bytes = LABELS_RANGE, b""
+    else:
+        kind, label_bytes = LABELS_JSON, json.dumps(labels).encode("utf-8")
+
+    offsets = _as_array(csr.offsets, "q")
+    targets = _as_array(csr.targets, "q")
+    weight_view = memoryview(csr.weights)
+    weights = _as_array(csr.weights, "q" if weight_view.format in ("q", "l") and weight_view.itemsize == 8 else "d")
+    if sys.byteorder != "little":
+        offsets, targets, weights = (array(a.typecode, a) for a in (offsets, targets, weights))
+        for values in (offsets, targets, weights):
+            values.byteswap()
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, kind, weights.typecode.encode(),
+                                        csr.node_count(), csr.edge_count(), first, len(label_bytes)))
+        for values in (offsets, targets, weights):
+            values.tofile(file)
+        file.write(label_bytes)
+    os.replace(temporary, path)  # Readers never see a half-written snapshot
+
+
+def _as_array(values, typecode):
+    """Return `values` as an array of `typecode`, copying only when the type differs."""
+    if isinstance(values, array) and values.typecode == typecode:
+        return values
+    view = memoryview(values)
+    if view.itemsize == 8 and view.format.replace("l", "q") == typecode:
+        return array(typecode, view.tobytes())  # Same layout: one bulk copy
+    return array(typecode, view.tolist())
+
+
+def load_snapshot(path):
+    """Map a snapshot written by save_snapshot back into a ready-to-query CSRGraph.
+
+    The offset, target and weight arrays are memoryviews of the mapped file,
+    so loading costs only the node labels. DIMACS-style ids stay a range with
+    an offset index (see CSRGraph), so those snapshots load in constant time.
+    """
+    with open(path, "rb") as file:
+        header = file.read(SNAPSHOT_HEADER.size)
+        if len(header) < SNAPSHOT_HEADER.size:
+            raise ValueError(f"{path} is not a graph snapshot (too short)")
+        magic, version, kind, typecode, nodes, edges, first, label_bytes = SNAPSHOT_HEADER.unpack(header)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot (bad magic)")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot version {version}")
+        typecode = typecode.decode()
+        size = SNAPSHOT_HEADER.size + 8 * (nodes + 1) + 16 * edges + label_bytes
+        if os.fstat(file.fileno()).st_size < size:
+            raise ValueError(f"{path} is truncated")
+        # The mapping stays open for as long as the graph's memoryviews are alive
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    start = SNAPSHOT_HEADER.size
+    arrays = []
+    for length, code in ((nodes + 1, "q"), (edges, "q"), (edges, typecode)):
+        arrays.append(view[start:start + 8 * length].cast(code))
+        start += 8 * length
+    if sys.byteorder != "little":
+        arrays = [array(a.format, a) for a in arrays]
+        for values in arrays:
+            values.byteswap()
+
+    if kind == LABELS_RANGE:
+        labels = range(first, first + nodes)
+    else:
+        labels = json.loads(bytes(view[start:start + label_bytes]).decode("utf-8"))
+    return CSRGraph(labels, *arrays)
+
+
+def load_cached(path, snapshot=None):
+    """Return the CSRGraph of an edge file, using a snapshot to skip parsing after the first load.
+
+    The snapshot (default: `path` + ".csrs") is rebuilt whenever the edge file
+    is newer than it.
+    """
+    if snapshot is None:
+        snapshot = path + ".csrs"
+    if os.path.exists(snapshot) and os.path.getmtime(snapshot) >= os.path.getmtime(path):
+        return load_snapshot(snapshot)
+    graph = load_csr(path)
+    save_snapshot(graph, snapshot)
+    return graph
+
+
+def main():
+    """Round-trip the city graph through a CSV edge file and a snapshot, timing each load."""
+    from ShortestDistanceCity import build_city_graph, dijkstra_city_distance
+    import tempfile
+
+    city = build_city_graph()
+    with tempfile.TemporaryDirectory() as folder:
+        edge_file = os.path.join(folder, "cities.csv")
+        with open(edge_file, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["from", "to", "distance"])
+            for (u, v), distance in city.distances.items():
+                writer.writerow([u, v, distance])
+
+        started = time.perf_counter()
+        graph = load_graph(edge_file)
+        print(f"CSV into Graph: {len(graph.distances)} edges in {1000 * (time.perf_counter() - started):.2f} ms")
+        started = time.perf_counter()
+        csr = load_cached(edge_file)
+        print(f"CSV into CSRGraph (and snapshot): {csr} in {1000 * (time.perf_counter() - started):.2f} ms")
+        started = time.perf_counter()
+        mapped = load_cached(edge_file)
+        print(f"Snapshot mmap: {mapped} in {1000 * (time.perf_counter() - started):.2f} ms")
+
+        same = dijkstra_city_distance(mapped, 'Denver')[0] == dijkstra_city_distance(city, 'Denver')[0]
+        print(f"Distances from Denver match the original graph: {same}")
+        del mapped, csr  # Release the mapping before the folder is removed
+
+
+if __name__ == "__main__":
+    main()
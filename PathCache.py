@@ -0,0 +1,122 @@
+import math
+from collections import OrderedDict
+from Dijkstra import dijkstra
+from ShortestDistanceCity import build_city_graph
+
+# #########################
+#
+#  Cached shortest-path trees
+#
+# #########################
+# Many queries repeat the same source. ShortestPathCache keeps the
+# (distances, predecessors) result of recent sources in LRU order, so a repeated
+# query only walks the predecessor map (O(path length)). Every cached tree is
+# tied to the graph's `version` counter; once Graph.add_node / Graph.add_edge
+# bump it, the whole cache is dropped on the next access.
+
+
+class ShortestPathCache:
+    """LRU cache of single-source shortest-path trees over one graph."""
+
+    def __init__(self, graph, engine=dijkstra, maxsize=128, max_nodes=None):
+        """`engine(graph, source)` must return (distances, predecessors).
+
+        At most `maxsize` trees are kept, and if `max_nodes` is given, at most
+        that many distance entries in total (the least recently used go first).
+        """
+        self.graph = graph
+        self.engine = engine
+        self.maxsize = maxsize
+        self.max_nodes = max_nodes
+        self.trees = OrderedDict()  # source -> (distances, predecessors), oldest first
+        self.nodes = 0  # Total number of distance entries held
+        self.version = getattr(graph, "version", 0)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def tree(self, source):
+        """Return the (distances, predecessors) of `source`, computing it on a miss."""
+        self._check_version()
+        cached = self.trees.get(source)
+        if cached is not None:
+            self.hits += 1
+            self.trees.move_to_end(source)
+            return cached
+
+        self.misses += 1
+        cached = self.engine(self.graph, source)
+        self.trees[source] = cached
+        self.nodes += len(cached[0])
+        self._evict()
+        return cached
+
+    def distance(self, source, target):
+        """Shortest distance from `source` to `target` (math.inf if unreachable)."""
+        return self.tree(source)[0].get(target, math.inf)
+
+    def path(self, source, target):
+        """Node list of the shortest route from `source` to `target` ([] if unreachable)."""
+        dist, pred = self.tree(source)
+        if target not in dist:
+            return []
+        path = [target]
+        while path[-1] != source:
+            path.append(pred[path[-1]])
+        path.reverse()
+        return path
+
+    def invalidate(self):
+        """Drop every cached tree."""
+        self.trees.clear()
+        self.nodes = 0
+        self.invalidations += 1
+
+    def info(self):
+        """Return hit / miss / eviction counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "trees": len(self.trees),
+            "nodes": self.nodes,
+        }
+
+    def _check_version(self):
+        version = getattr(self.graph, "version", 0)
+        if version != self.version:
+            self.version = version
+            if self.trees:
+                self.invalidate()
+
+    def _evict(self):
+        # Keep the newest tree even if it alone exceeds max_nodes
+        while len(self.trees) > 1 and (len(self.trees) > self.maxsize or
+                                       (self.max_nodes is not None and self.nodes > self.max_nodes)):
+            _, (dist, _) = self.trees.popitem(last=False)
+            self.nodes -= len(dist)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.trees)
+
+
+def main():
+    """Answer repeated queries from the cache, then edit the graph and query again."""
+    g = build_city_graph()
+    cache = ShortestPathCache(g, maxsize=4)
+    for target in ['Boston', 'Miami', 'Seattle', 'NY']:
+        print(f"Denver to {target}: {cache.distance('Denver', target)} via {' to '.join(cache.path('Denver', target))}")
+
+    # A new direct road invalidates every cached tree
+    g.add_edge('Denver', 'Miami', 2000)
+    print(f"After adding Denver-Miami: {cache.distance('Denver', 'Miami')}")
+    print(cache.info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+from heapq import heappush, heappop
+from itertools import count
+
+# #########################
+#
+#  Priority queues for Dijkstra's algorithm
+#
+# #########################
+# Every queue here shares the same small interface so the shortest-path
+# functions can swap them with the `queue=` parameter:
+#   push(node, priority)  insert a node, or lower its priority if it is already queued
+#   pop()                 remove and return (node, priority) with the smallest priority
+#   peek()                return that pair without removing it
+#   len(queue)            number of nodes still waiting to be popped
+# Nodes with equal priority come out in the order they were pushed.
+
+
+class LazyHeap:
+    """Binary heap (heapq) that handles decrease-key by lazy deletion."""
+
+    def __init__(self):
+        self.heap = []  # Entries of [priority, push order, node], possibly stale
+        self.priority = {}  # Current priority of every node still in the queue
+        self.order = count()  # Tie breaker, so nodes themselves are never compared
+
+    def push(self, node, priority):
+        """Insert `node`, or re-insert it with a smaller priority (the old entry goes stale)."""
+        current = self.priority.get(node)
+        if current is not None and current <= priority:
+            return
+        self.priority[node] = priority
+        heappush(self.heap, (priority, next(self.order), node))
+
+    def pop(self):
+        """Remove and return the (node, priority) pair with the smallest priority."""
+        while self.heap:
+            priority, _, node = heappop(self.heap)
+            # Skip entries that were superseded by a later decrease-key
+            if self.priority.get(node) == priority:
+                del self.priority[node]
+                return node, priority
+        raise IndexError("pop from an empty priority queue")
+
+    def peek(self):
+        """Return the (node, priority) pair with the smallest priority without removing it."""
+        heap = self.heap
+        while heap:
+            priority, _, node = heap[0]
+            if self.priority.get(node) == priority:
+                return node, priority
+            heappop(heap)  # Drop the stale entry now, pop() would skip it anyway
+        raise IndexError("peek at an empty priority queue")
+
+    def __len__(self):
+        return len(self.priority)
+
+
+class DaryHeap:
+    """Indexed d-ary heap with a true decrease-key operation."""
+
+    def __init__(self, d=4):
+        self.d = d  # Number of children per heap node
+        self.heap = []  # Heap-ordered list of [priority, push order, node]
+        self.position = {}  # Index of every queued node inside `heap`
+        self.order = count()
+
+    def push(self, node, priority):
+        """Insert `node`, or decrease its priority in place."""
+        index = self.position.get(node)
+        if index is None:
+            self.heap.append((priority, next(self.order), node))
+            index = len(self.heap) - 1
+            self.position[node] = index
+        elif priority < self.heap[index][0]:
+            self.heap[index] = (priority, self.heap[index][1], node)
+        else:
+            return
+        self._sift_up(index)
+
+    def pop(self):
+        """Remove and return the (node, priority) pair with the smallest priority."""
+        if not self.heap:
+            raise IndexError("pop from an empty priority queue")
+        priority, _, node = self.heap[0]
+        del self.position[node]
+        last = self.heap.pop()
+        if self.heap:
+            self.heap[0] = last
+            self.position[last[2]] = 0
+            self._sift_down(0)
+        return node, priority
+
+    def peek(self):
+        """Return the (node, priority) pair with the smallest priority without removing it."""
+        if not self.heap:
+            raise IndexError("peek at an empty priority queue")
+        priority, _, node = self.heap[0]
+        return node, priority
+
+    def _sift_up(self, index):
+        heap, position, d = self.heap, self.position, self.d
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) // d
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _sift_down(self, index):
+        heap, position, d = self.heap, self.position, self.d
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            first = d * index + 1
+            if first >= size:
+                break
+            # Pick the smallest of the (up to d) children
+            smallest = min(range(first, min(first + d, size)), key=heap.__getitem__)
+            if entry <= heap[smallest]:
+                break
+            heap[index] = heap[smallest]
+            position[heap[index][2]] = index
+            index = smallest
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def __len__(self):
+        return len(self.heap)
+
+
+class PairingNode:
+    """Node of a pairing heap (child / sibling / previous pointers)."""
+    __slots__ = ("key", "node", "child", "sibling", "prev")
+
+    def __init__(self, key, node):
+        self.key = key  # (priority, push order)
+        self.node = node
+        self.child = None  # Leftmost child
+        self.sibling = None  # Next sibling to the right
+        self.prev = None  # Parent if leftmost child, otherwise left sibling
+
+
+class PairingHeap:
+    """Pairing heap with O(1) insert and amortized o(log n) decrease-key."""
+
+    def __init__(self):
+        self.root = None
+        self.handles = {}  # PairingNode of every queued node
+        self.order = count()
+
+    def _meld(self, a, b):
+        """Link two heap roots and return the new root."""
+        if a is None:
+            return b
+        if b is None:
+            return a
+        if b.key < a.key:
+            a, b = b, a
+        # b becomes the leftmost child of a
+        b.prev = a
+        b.sibling = a.child
+        if a.child is not None:
+            a.child.prev = b
+        a.child = b
+        a.sibling = None
+        a.prev = None
+        return a
+
+    def push(self, node, priority):
+        """Insert `node`, or cut it out and re-meld it with a smaller priority."""
+        handle = self.handles.get(node)
+        if handle is None:
+            handle = PairingNode((priority, next(self.order)), node)
+            self.handles[node] = handle
+            self.root = self._meld(self.root, handle)
+            return
+        if priority >= handle.key[0]:
+            return
+        handle.key = (priority, handle.key[1])
+        if handle is self.root:
+            return
+        # Detach the subtree rooted at `handle` from its parent / siblings
+        if handle.prev.child is handle:
+            handle.prev.child = handle.sibling
+        else:
+            handle.prev.sibling = handle.sibling
+        if handle.sibling is not None:
+            handle.sibling.prev = handle.prev
+        handle.sibling = None
+        handle.prev = None
+        self.root = self._meld(self.root, handle)
+
+    def pop(self):
+        """Remove and return the (node, priority) pair with the smallest priority."""
+        root = self.root
+        if root is None:
+            raise IndexError("pop from an empty priority queue")
+        del self.handles[root.node]
+
+        # Two-pass pairing: meld children left to right in pairs, then right to left
+        pairs = []
+        child = root.child
+        while child is not None:
+            first = child
+            second = child.sibling
+            child = second.sibling if second is not None else None
+            first.sibling = first.prev = None
+            if second is not None:
+                second.sibling = second.prev = None
+            pairs.append(self._meld(first, second))
+        new_root = None
+        for heap in reversed(pairs):
+            new_root = self._meld(heap, new_root)
+        self.root = new_root
+        return root.node, root.key[0]
+
+    def peek(self):
+        """Return the (node, priority) pair with the smallest priority without removing it."""
+        if self.root is None:
+            raise IndexError("peek at an empty priority queue")
+        return self.root.node, self.root.key[0]
+
+    def __len__(self):
+        return len(self.handles)
+
+
+# Names accepted by the `queue=` parameter of the shortest-path functions
+QUEUES = {
+    "heap": LazyHeap,
+    "dary": DaryHeap,
+    "pairing": PairingHeap,
+}
+
+
+def make_queue(queue):
+    """Create an empty priority queue from a name in QUEUES (or a queue class / factory)."""
+    if callable(queue):
+        return queue()
+    try:
+        return QUEUES[queue]()
+    except KeyError:
+        raise ValueError(f"Unknown queue '{queue}', expected one of {sorted(QUEUES)} or 'scan'") from None
@@ -0,0 +1,22 @@
+import sys
+
+try:
+    import resource  # Peak RSS (not available on Windows)
+except ImportError:
+    resource = None
+
+# #########################
+#
+#  Process resource usage
+#
+# #########################
+# Kept free of the graph and codec modules, so the benchmarks' child processes
+# import nothing but what they measure.
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10  # Bytes on macOS, KB elsewhere
@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from Dijkstra import dijkstra
+from ShortestDistanceCity import build_city_graph, kruskalMST
+from ShortestPath import build_path
+
+# #########################
+#
+#  Routing service
+#
+# #########################
+# A long-lived asyncio server that loads the graph once and answers queries
+# sent as line-delimited JSON over a local TCP socket, one object per line:
+#   {"id": 1, "op": "path", "source": "Denver", "target": "Boston"}
+#   {"id": 2, "op": "distances", "source": "Denver"}
+#   {"id": 3, "op": "mst"}
+#   {"id": 4, "op": "metrics"}
+# Every reply is one line {"id": ..., "ok": true, "result": ...} (or "ok":
+# false with an "error"), possibly out of order. Searches run in a worker
+# pool, so the event loop never blocks, and queries that arrive while a search
+# from the same source is running wait for that search instead of starting
+# another one. Process workers hold a copy of the graph, so the pool is
+# replaced whenever the graph's `version` changes.
+
+LATENCY_SAMPLES = 10_000  # Latencies kept per operation for the percentiles
+
+# Graph of a pool worker, set once by _init_worker
+_worker = {}
+
+
+def _init_worker(graph):
+    _worker["graph"] = graph
+
+
+def _worker_search(source):
+    return dijkstra(_worker["graph"], source)
+
+
+class RoutingService:
+    """Answers shortest-path and MST queries over one preloaded graph."""
+
+    def __init__(self, graph, workers=None, executor="process"):
+        """`executor` is "process" (the graph is sent to each worker, again after each edit) or "thread"."""
+        self.graph = graph
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.version = getattr(graph, "version", 0)  # Graph version the pool and in-flight searches use
+        self.pool = self._new_pool()
+        self.search = _worker_search if executor == "process" else partial(dijkstra, graph)
+        self.inflight = {}  # source -> Future of the running search
+        self.mst = None  # (graph version, MST edges), computed on first request
+        self.latencies = {}  # op -> recent latencies in seconds
+        self.counters = {"requests": 0, "errors": 0, "searches": 0, "coalesced": 0, "pool_restarts": 0}
+        self.pending = 0  # Requests accepted but not answered yet
+        self.max_pending = 0
+        self.max_inflight = 0
+        self.server = None
+        self.clients = {}  # writer -> handler task of each open connection
+
+    def _new_pool(self):
+        if self.executor == "process":
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.graph,))
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def _sync_version(self):
+        """After a graph edit, stop sharing older searches and give process workers the new graph."""
+        version = getattr(self.graph, "version", 0)
+        if version == self.version:
+            return
+        self.version = version
+        self.inflight.clear()  # Searches under way answer for the old graph
+        if self.executor == "process":
+            old, self.pool = self.pool, self._new_pool()
+            old.shutdown(wait=False)  # Its running searches still finish
+            self.counters["pool_restarts"] += 1
+
+    # #########################
+    #  Queries
+    # #########################
+    async def tree(self, source):
+        """Return (distances, predecessors) from `source`, sharing a search already under way."""
+        self._sync_version()
+        future = self.inflight.get(source)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.pool, self.search, source)
+        self.inflight[source] = future
+        self.counters["searches"] += 1
+        self.max_inflight = max(self.max_inflight, len(self.inflight))
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self.inflight.get(source) is future:
+                del self.inflight[source]
+
+    async def handle(self, request):
+        """Answer one decoded request; returns the result (raises on bad requests)."""
+        op = request.get("op")
+        if op == "path":
+            source, target = request["source"], request["target"]
+            dist, pred = await self.tree(source)
+            if target not in dist:
+                return {"distance": None, "path": []}
+            return {"distance": dist[target], "path": build_path(pred, source, target)}
+        if op == "distances":
+            dist, _ = await self.tree(request["source"])
+            return dist
+        if op == "mst":
+            self._sync_version()
+            version = self.version
+            if self.mst is None or self.mst[0] != version:
+                loop = asyncio.get_running_loop()
+                edges = await loop.run_in_executor(None, kruskalMST, self.graph)
+                self.mst = (version, edges)
+            edges = self.mst[1]
+            return {"total": sum(w for _, _, w in edges), "edges": edges}
+        if op == "metrics":
+            return self.metrics()
+        raise ValueError(f"Unknown op {op!r}")
+
+    # #########################
+    #  Metrics
+    # #########################
+    def metrics(self):
+        """Return request counters, queue depths and latency percentiles (ms) per operation."""
+        latency = {}
+        for op, samples in self.latencies.items():
+            ordered = sorted(samples)
+            latency[op] = {f"p{p}": 1000 * ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+                           for p in (50, 90, 99)}
+            latency[op]["count"] = len(ordered)
+        return {
+            **self.counters,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "inflight_searches": len(self.inflight),
+            "max_inflight_searches": self.max_inflight,
+            "latency_ms": latency,
+        }
+
+    def _record(self, op, seconds):
+        samples = self.latencies.get(op)
+        if samples is None:
+            samples = self.latencies[op] = deque(maxlen=LATENCY_SAMPLES)
+        samples.append(seconds)
+
+    # #########################
+    #  Server
+    # #########################
+    async def _respond(self, line, writer, lock):
+        started = time.perf_counter()
+        self.pending += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        request = {}
+        try:
+            request = json.loads(line)
+            reply = {"id": request.get("id"), "ok": True, "result": await self.handle(request)}
+        except Exception as error:  # Report the failure to the client, keep serving
+            self.counters["errors"] += 1
+            reply = {"id": request.get("id") if isinstance(request, dict) else None, "ok": False,
+                     "error": f"{type(error).__name__}: {error}"}
+        finally:
+            self.pending -= 1
+        self.counters["requests"] += 1
+        self._record(request.get("op", "invalid") if isinstance(request, dict) else "invalid",
+                     time.perf_counter() - started)
+        async with lock:  # Replies from concurrent requests must not interleave
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+
+    async def _client(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        self.clients[writer] = asyncio.current_task()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(self._respond(line, writer, lock))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass  # The client went away; its pending replies are dropped
+        finally:
+            del self.clients[writer]
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Start listening; returns the asyncio server (port=0 picks a free port)."""
+        self.server = await asyncio.start_server(self._client, host, port)
+        return self.server
+
+    async def close(self):
+        """Stop listening, end the open connections (after their pending replies) and the pool."""
+        if self.server is not None:
+            self.server.close()
+            handlers = list(self.clients.values())
+            for writer in list(self.clients):
+                writer.transport.close()  # Idle readers see end of file and finish normally
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self.server.wait_closed()
+        self.pool.shutdown()
+
+
+async def query(host, port, requests):
+    """Send requests over one connection and return the replies in request order (a small client)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    for number, request in enumerate(requests):
+        writer.write(json.dumps({"id": number, **request}).encode() + b"\n")
+    await writer.drain()
+    replies = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    await writer.wait_closed()
+    return sorted(replies, key=lambda reply: reply["id"])
+
+
+async def _demo():
+    service = RoutingService(build_city_graph(), workers=2)
+    server = await service.start(port=0)
+    host, port = server.sockets[0].getsockname()[:2]
+    try:
+        # Eight queries from Denver in one burst share a single search
+        requests = [{"op": "path", "source": "Denver", "target": city}
+                    for city in ['Boston', 'Miami', 'Seattle', 'NY', 'LA', 'Dallas', 'Chicago', 'Houston']]
+        requests += [{"op": "path", "source": "Seattle", "target": "Miami"}, {"op": "mst"}]
+        for reply in await query(host, port, requests):
+            result = reply["result"]
+            if "path" in result:
+                print(f"{' to '.join(result['path'])}: {result['distance']}")
+            else:
+                print(f"MST: {len(result['edges'])} edges, total {result['total']}")
+        print((await query(host, port, [{"op": "metrics"}]))[0]["result"])
+    finally:
+        await service.close()
+
+
+async def _serve(graph, host, port, workers, executor):
+    service = RoutingService(graph, workers, executor)
+    server = await service.start(host, port)
+    print(f"Serving routes on {host}:{server.sockets[0].getsockname()[1]}")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    """Run a short demo, or with --serve a long-lived service (optionally over an edge file)."""
+    parser = argparse.ArgumentParser(description="Line-delimited JSON routing service.")
+    parser.add_argument("--serve", action="store_true", help="serve until interrupted instead of running the demo")
+    parser.add_argument("--graph", help="edge file to load (see GraphLoader.py); default: the city graph")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--executor", choices=["process", "thread"], default="process")
+    args = parser.parse_args(argv)
+    if not args.serve:
+        asyncio.run(_demo())
+        return
+    if args.graph:
+        from GraphLoader import load_graph
+        graph = load_graph(args.graph)
+    else:
+        graph = build_city_graph()
+    try:
+        asyncio.run(_serve(graph, args.host, args.port, args.workers, args.executor))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
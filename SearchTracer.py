@@ -0,0 +1,128 @@
+import time
+
+# #########################
+#
+#  Search tracers
+#
+# #########################
+# The shortest-path functions are silent by default. Pass `tracer=` to observe
+# a search: the function calls the hooks below as it runs (and does no extra
+# work at all when no tracer is given). Subclass Tracer and override only the
+# hooks you need.
+
+
+class Tracer:
+    """Base class for search hooks; every hook does nothing."""
+
+    def on_start(self, source, dist, pred):
+        """Search begins; `dist` and `pred` are the live result dicts."""
+
+    def on_settle(self, node, distance):
+        """`node` is taken off the queue with its final distance."""
+
+    def on_relax(self, node, neighbor, old, new):
+        """Edge node -> neighbor lowers neighbor's distance from `old` (None if unreached) to `new`."""
+
+    def on_skip(self, node, neighbor, distance):
+        """Edge node -> neighbor is examined but does not improve `distance`."""
+
+    def on_push(self, node, priority):
+        """`node` is pushed on the priority queue (or its priority is lowered)."""
+
+    def on_pop(self, node, priority):
+        """An entry is popped from the priority queue (including stale ones)."""
+
+    def on_finish(self):
+        """Search is done."""
+
+
+class SearchStats(Tracer):
+    """Counts the work a search does and times it."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.searches = 0
+        self.settled = 0
+        self.relaxed = 0
+        self.skipped = 0
+        self.pushes = 0
+        self.pops = 0
+        self.seconds = 0.0
+        self._started = None
+
+    def on_start(self, source, dist, pred):
+        self.searches += 1
+        self._started = time.perf_counter()
+
+    def on_settle(self, node, distance):
+        self.settled += 1
+
+    def on_relax(self, node, neighbor, old, new):
+        self.relaxed += 1
+
+    def on_skip(self, node, neighbor, distance):
+        self.skipped += 1
+
+    def on_push(self, node, priority):
+        self.pushes += 1
+
+    def on_pop(self, node, priority):
+        self.pops += 1
+
+    def on_finish(self):
+        if self._started is not None:
+            self.seconds += time.perf_counter() - self._started
+            self._started = None
+
+    def report(self):
+        """Return the counters as a dict (totals over every search since reset)."""
+        return {
+            "searches": self.searches,
+            "nodes_settled": self.settled,
+            "edges_relaxed": self.relaxed,
+            "edges_skipped": self.skipped,
+            "heap_pushes": self.pushes,
+            "heap_pops": self.pops,
+            "wall_time": self.seconds,
+        }
+
+    def __str__(self):
+        return ", ".join(f"{name}: {value:.6f}" if isinstance(value, float) else f"{name}: {value}"
+                         for name, value in self.report().items())
+
+
+class MultiTracer(Tracer):
+    """Forwards every hook to several tracers (e.g. a printer and a SearchStats)."""
+
+    def __init__(self, *tracers):
+        self.tracers = tracers
+
+    def on_start(self, source, dist, pred):
+        for tracer in self.tracers:
+            tracer.on_start(source, dist, pred)
+
+    def on_settle(self, node, distance):
+        for tracer in self.tracers:
+            tracer.on_settle(node, distance)
+
+    def on_relax(self, node, neighbor, old, new):
+        for tracer in self.tracers:
+            tracer.on_relax(node, neighbor, old, new)
+
+    def on_skip(self, node, neighbor, distance):
+        for tracer in self.tracers:
+            tracer.on_skip(node, neighbor, distance)
+
+    def on_push(self, node, priority):
+        for tracer in self.tracers:
+            tracer.on_push(node, priority)
+
+    def on_pop(self, node, priority):
+        for tracer in self.tracers:
+            tracer.on_pop(node, priority)
+
+    def on_finish(self):
+        for tracer in self.tracers:
+            tracer.on_finish()
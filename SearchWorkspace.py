@@ -0,0 +1,169 @@
+import math
+import time
+from heapq import heappush, heappop
+from CSRGraph import CSRGraph
+from Dijkstra import dijkstra
+from GraphGenerators import build_graph, generate
+from ShortestDistanceCity import build_city_graph
+
+# #########################
+#
+#  Reusable search workspace
+#
+# #########################
+# dijkstra and dijkstra_city_distance allocate dicts and sets sized to the whole
+# graph on every call, which dominates short local queries. A SearchWorkspace
+# allocates its distance, predecessor and heap storage once per graph. Every
+# slot also holds the number of the query that last wrote it, and a slot from an
+# older query counts as unset. Starting a new query just increments that number,
+# so resetting costs O(1), and a query only touches the nodes it reaches:
+#   one_to_many(source, targets)  stops once every target is settled
+#   within(source, radius)        isochrone: every node within `radius`
+
+
+class SearchWorkspace:
+    """Preallocated Dijkstra state over one graph, reused by every query."""
+
+    def __init__(self, graph):
+        """`graph` is a Graph or CSRGraph; a Graph is packed into CSR form (again after each edit)."""
+        self.graph = graph
+        self.version = None
+        self.stamp = 0  # Number of the current query
+        self.heap = []  # (distance, node id) entries, possibly stale
+        self.touched = []  # Node ids settled by the current query, in order
+        self.queries = 0
+        self._prepare()
+
+    def _prepare(self):
+        """(Re)build the CSR form and the per-node arrays if the graph changed since the last query."""
+        version = getattr(self.graph, "version", 0)
+        if version == self.version:
+            return
+        graph = self.graph
+        self.csr = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+        self.version = version
+        size = self.csr.node_count()
+        self.dist = [math.inf] * size
+        self.pred = [-1] * size
+        self.seen = [0] * size  # Query that last set dist/pred (older: unset)
+        self.done = [0] * size  # Query that settled the node
+        self.stamp = 0
+
+    # #########################
+    #  Core search
+    # #########################
+    def _search(self, source, targets=None, radius=math.inf):
+        """Settle nodes from `source` in distance order; returns False if `source` is unknown.
+
+        Stops when every id in `targets` is settled or the next distance
+        exceeds `radius`. The settled ids are left in self.touched.
+        """
+        self._prepare()
+        self.queries += 1
+        self.stamp += 1
+        stamp = self.stamp
+        self.touched.clear()
+        self.heap.clear()
+        s = self.csr.index.get(source)
+        if s is None:
+            return False
+
+        dist, pred, seen, done = self.dist, self.pred, self.seen, self.done
+        offsets, to, weights = self.csr.offsets, self.csr.targets, self.csr.weights
+        heap, touched = self.heap, self.touched
+        remaining = None if targets is None else set(targets)
+        dist[s], pred[s], seen[s] = 0, -1, stamp
+        heap.append((0, s))
+
+        while heap:
+            d, u = heappop(heap)
+            if done[u] == stamp or d > dist[u]:
+                continue  # Stale entry
+            if d > radius:
+                break
+            done[u] = stamp
+            touched.append(u)
+            if remaining is not None:
+                remaining.discard(u)
+                if not remaining:
+                    break
+            for k in range(offsets[u], offsets[u + 1]):
+                v = to[k]
+                weight = d + weights[k]
+                if seen[v] != stamp or weight < dist[v]:
+                    dist[v], pred[v], seen[v] = weight, u, stamp
+                    heappush(heap, (weight, v))
+        return True
+
+    # #########################
+    #  Queries
+    # #########################
+    def tree(self, source, radius=math.inf):
+        """Return (distances, predecessors) like Dijkstra.dijkstra, limited to nodes within `radius`."""
+        if not self._search(source, radius=radius):
+            return {source: 0}, {}
+        labels, dist, pred = self.csr.labels, self.dist, self.pred
+        distances = {labels[u]: dist[u] for u in self.touched}
+        parents = {labels[u]: labels[pred[u]] for u in self.touched if pred[u] >= 0}
+        return distances, parents
+
+    def within(self, source, radius):
+        """Isochrone: return {node: distance} for every node at most `radius` from `source`."""
+        if not self._search(source, radius=radius):
+            return {source: 0}
+        labels, dist = self.csr.labels, self.dist
+        return {labels[u]: dist[u] for u in self.touched}
+
+    def one_to_many(self, source, targets):
+        """Return {target: distance} (math.inf if unreachable), searching only until all targets are settled."""
+        index = self.csr.index
+        ids = [index[t] for t in targets if t in index]
+        result = dict.fromkeys(targets, math.inf)
+        if not ids or not self._search(source, targets=ids):
+            if source in result:
+                result[source] = 0
+            return result
+        labels, dist, done, stamp = self.csr.labels, self.dist, self.done, self.stamp
+        for u in ids:
+            if done[u] == stamp:
+                result[labels[u]] = dist[u]
+        return result
+
+    def shortest_path(self, source, target):
+        """Return (distance, [source, ..., target]), or (math.inf, []) if there is no route."""
+        if source == target:
+            return 0, [source]
+        t = self.csr.index.get(target)
+        if t is None or not self._search(source, targets=[t]) or self.done[t] != self.stamp:
+            return math.inf, []
+        labels, pred = self.csr.labels, self.pred
+        path = [t]
+        while pred[path[-1]] >= 0:
+            path.append(pred[path[-1]])
+        return self.dist[t], [labels[u] for u in reversed(path)]
+
+    def __repr__(self):
+        return f"SearchWorkspace({self.csr!r}, {self.queries} queries)"
+
+
+def main():
+    """Answer a few city queries, then time repeated local queries against full dijkstra runs."""
+    workspace = SearchWorkspace(build_city_graph())
+    print(f"Within 1500 of Denver: {workspace.within('Denver', 1500)}")
+    print(f"Denver to the coasts: {workspace.one_to_many('Denver', ['Boston', 'Miami', 'Seattle'])}")
+    print(f"Denver to Miami: {workspace.shortest_path('Denver', 'Miami')}")
+
+    grid = build_graph(generate("grid", 100_000, seed=1), csr=True)
+    workspace = SearchWorkspace(grid)
+    sources = range(0, grid.node_count(), grid.node_count() // 20)
+    for name, query in [("dijkstra (whole graph)", lambda s: dijkstra(grid, s)),
+                        ("workspace radius 300", lambda s: workspace.within(s, 300)),
+                        ("workspace one-to-many", lambda s: workspace.one_to_many(s, [s + 1, s + 2]))]:
+        started = time.perf_counter()
+        for s in sources:
+            query(s)
+        print(f"{name}: {1000 * (time.perf_counter() - started) / len(sources):.3f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
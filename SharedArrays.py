@@ -0,0 +1,44 @@
+from array import array
+from multiprocessing import shared_memory
+
+# #########################
+#
+#  Arrays shared with pool workers
+#
+# #########################
+# The parallel searches (DistanceMatrix.py, DeltaStepping.py) copy the CSR
+# arrays into shared memory once; each pool worker maps them at start-up
+# through init_worker, so tasks only carry node ids and results.
+
+# State of a pool worker, set once by init_worker
+worker = {}
+
+
+def share(arrays):
+    """Copy arrays (array.array, NumPy or any contiguous buffer) into new shared memory blocks; returns the blocks."""
+    blocks = []
+    for values in arrays:
+        raw = memoryview(values).cast("B")
+        block = shared_memory.SharedMemory(create=True, size=max(1, raw.nbytes))
+        block.buf[:raw.nbytes] = raw
+        blocks.append(block)
+    return blocks
+
+
+def release(blocks):
+    """Close and remove blocks created by share."""
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def init_worker(names, lengths, typecodes, state=None):
+    """Pool initializer: map the shared blocks as typed memoryviews in worker["arrays"].
+
+    `state` (a dict) is merged into `worker` for the task function to use.
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    worker["blocks"] = blocks  # Keep the mappings alive for the life of the worker
+    worker["arrays"] = [block.buf[:length * array(code).itemsize].cast(code)
+                        for block, length, code in zip(blocks, lengths, typecodes)]
+    worker.update(state or {})
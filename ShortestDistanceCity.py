@@ -1,5 +1,7 @@
 import sys  # Library for INT_MAX
 from collections import defaultdict
+from PriorityQueues import make_queue
+from SearchTracer import Tracer
 
 # #########################
 #
@@ -13,23 +15,58 @@ class Graph:
         self.nodes = set()  # A set to store all nodes (cities) in the graph
         self.edges = defaultdict(list)  # Adjacency list to store edges (roads)
         self.distances = {}  # Dictionary to store distances between nodes (cities)
+        self.version = 0  # Change counter, lets cached results (PathCache.py) detect edits
 
     def add_node(self, value):
         """Add a node (city) to the graph."""
-        self.nodes.add(value)
+        if value not in self.nodes:
+            self.nodes.add(value)
+            self.version += 1
 
     def add_edge(self, from_node, to_node, distance):
-        """Add an edge (road) between two nodes with a specific distance."""
-        self.edges[from_node].append(to_node)  # Directed edge from 'from_node' to 'to_node'
+        """Add an edge (road) between two nodes with a specific distance (or update its distance)."""
+        if (from_node, to_node) not in self.distances or to_node not in self.edges[from_node]:
+            self.edges[from_node].append(to_node)  # Directed edge from 'from_node' to 'to_node'
         self.distances[(from_node, to_node)] = distance  # Distance between the two nodes
+        self.version += 1
+
+    def add_edges(self, edges):
+        """Add or update many (from_node, to_node, distance) roads at once, adding their cities too.
+
+        Used by the bulk loaders in GraphLoader.py; bumps `version` once per batch.
+        """
+        edges_out, distances, nodes = self.edges, self.distances, self.nodes
+        for from_node, to_node, distance in edges:
+            if (from_node, to_node) not in distances or to_node not in edges_out[from_node]:
+                edges_out[from_node].append(to_node)
+            distances[(from_node, to_node)] = distance
+            nodes.add(from_node)
+            nodes.add(to_node)
+        self.version += 1
+
+    def remove_edge(self, from_node, to_node):
+        """Remove the edge (road) from 'from_node' to 'to_node'."""
+        self.edges[from_node].remove(to_node)
+        del self.distances[(from_node, to_node)]
+        self.version += 1
+
+    def neighbors(self, node):
+        """Yield (neighbor, distance) for every road leaving `node` (same method as CSRGraph)."""
+        for to_node in self.edges.get(node, ()):
+            yield to_node, self.distances[(node, to_node)]
 
     def initializeDistances(self):
-        """Initialize all distances between nodes to infinity (for MST)."""
+        """Initialize all distances between nodes to infinity (for MST).
+
+        Only the dense, matrix-style lookups need this (it stores V^2 entries);
+        primMST and kruskalMST work from the adjacency list without it.
+        """
         for i in self.nodes:
             for j in self.nodes:
                 self.distances[(i, j)] = sys.maxsize  # Set to max size for all pairs
 
             self.distances[(i, "")] = 0  # Distance from any node to itself is 0
+        self.version += 1
 
 ##### End of Graph class #####
 
@@ -38,20 +75,60 @@ class Graph:
 #  Dijkstra's SSSP (Single Source Shortest Path)
 #
 # #########################
-def dijkstra_city_distance(graph, s):
-    """Implement Dijkstra's algorithm to find the shortest paths from source `s`."""
+class PathPrinter(Tracer):
+    """Tracer that prints the distance and path of every city as it is settled."""
+
+    def on_start(self, source, dist, pred):
+        self.source = source
+        self.path = pred
+
+    def on_settle(self, node, distance):
+        print(f'Distance from {self.source} to {node}: {distance} with path ({pathString(self.path, self.source, node)})')
+
+def pathString(path, s, node):
+    """Build the 'A to B to C' route from `s` to `node` out of the predecessor map."""
+    route = ""
+    currentCity = node
+    while path[currentCity] != currentCity:
+        route = ' to ' + currentCity + route
+        currentCity = path[currentCity]
+    return s + route
+
+def dijkstra_city_distance(graph, s, queue="heap", tracer=None):
+    """Implement Dijkstra's algorithm to find the shortest paths from source `s`.
+
+    `queue` is "scan" for the original O(V^2) minimum search, or one of the
+    priority queues in PriorityQueues.QUEUES ("heap", "dary", "pairing").
+    Nothing is printed unless a `tracer` is given (PathPrinter shows each route).
+    """
     visited = {s: 0}  # Dictionary to store shortest distances from source
     path = dict.fromkeys(graph.nodes, "")  # Dictionary to store paths to nodes
 
     nodes = set(graph.nodes)  # All nodes in the graph
+    pq = None if queue == "scan" else make_queue(queue)  # Reached, unvisited nodes
+    if tracer is not None:
+        tracer.on_start(s, visited, path)
+    if pq is not None:
+        pq.push(s, 0)
+        if tracer is not None:
+            tracer.on_push(s, 0)
 
     # Process nodes until all have been visited
     while nodes:
         min_node = None
-        # Find the node with the smallest distance from the visited nodes
-        for node in nodes:
-            if node in visited:
-                if min_node is None or visited[node] < visited[min_node]:
+        if pq is None:
+            # Find the node with the smallest distance from the visited nodes
+            for node in nodes:
+                if node in visited:
+                    if min_node is None or visited[node] < visited[min_node]:
+                        min_node = node
+        else:
+            # Pop the closest node, skipping anything already processed
+            while pq and min_node is None:
+                node, priority = pq.pop()
+                if tracer is not None:
+                    tracer.on_pop(node, priority)
+                if node in nodes:
                     min_node = node
 
         # If there are no reachable nodes, break
@@ -61,27 +138,29 @@ def dijkstra_city_distance(graph, s):
         nodes.remove(min_node)  # Remove the processed node from the set
         current_weight = visited[min_node]  # Current shortest distance to `min_node`
 
-        # Display the shortest path to `min_node`
-        pathString = ""
-        currentCity = min_node
-
-        # Construct the path string
-        if path[currentCity] == "":
-            path[currentCity] = currentCity
-        while path[currentCity] != currentCity:
-            pathString = ' to ' + currentCity + pathString
-            currentCity = path[currentCity]
-
-        pathString = s + pathString
-        print(f'Distance from {s} to {min_node}: {visited[min_node]} with path ({pathString})')
+        # The source is its own predecessor, which ends every path walk
+        if path[min_node] == "":
+            path[min_node] = min_node
+        if tracer is not None:
+            tracer.on_settle(min_node, current_weight)
 
         # Relaxation step - update distances and paths for neighbors
-        for v in graph.edges[min_node]:
-            weight = current_weight + graph.distances[(min_node, v)]
+        for v, distance in graph.neighbors(min_node):
+            weight = current_weight + distance
             if v not in visited or weight < visited[v]:
+                if tracer is not None:
+                    tracer.on_relax(min_node, v, visited.get(v), weight)
                 visited[v] = weight
                 path[v] = min_node
-
+                if pq is not None:
+                    pq.push(v, weight)
+                    if tracer is not None:
+                        tracer.on_push(v, weight)
+            elif tracer is not None:
+                tracer.on_skip(min_node, v, visited[v])
+
+    if tracer is not None:
+        tracer.on_finish()
     return visited, path
 
 # #########################
@@ -89,26 +168,34 @@ def dijkstra_city_distance(graph, s):
 #  Minimum Spanning Tree (MST) - Prim's Algorithm
 #
 # #########################
-def printMST(parent, g):
-    """Print the edges of the Minimum Spanning Tree (MST) with their weights."""
+def printMST(parent, g, key=None):
+    """Print the edges of the Minimum Spanning Tree (MST) with their weights.
+
+    `key` maps each node to the weight of its MST edge; without it the weights
+    are looked up in `g.distances`, which needs initializeDistances for the root.
+    """
+    weight = key if key is not None else {i: g.distances[(i, parent[i])] for i in parent}
     print ("---------------------------------------------------------------")
     print ("\tEdge\t\tWeight")
     print ("---------------------------------------------------------------")
     total = 0  # Total weight of the MST
     # Iterate through the parent nodes to print the MST edges
     for i in parent.keys():
+        # Skip nodes that are not connected to the root
+        if parent[i] is None:
+            continue
         # If i is the root node, print it with distance 0
         if (parent[i] == "") :
-            print(f"{i:>15} {i:>15} {g.distances[(i, parent[i])]:.>20d}")
+            print(f"{i:>15} {i:>15} {weight[i]:.>20d}")
         elif(parent[i] != ""):
-            total += g.distances[(i, parent[i])]
-            print(f"{i:>15} {i:>15} {g.distances[(i, parent[i])]:.>20d}")
+            total += weight[i]
+            print(f"{i:>15} {i:>15} {weight[i]:.>20d}")
         else:
-            print(f"{parent[i]:>15} {i:>15} {g.distances[(i, parent[i])]:.>20d}")
+            print(f"{parent[i]:>15} {i:>15} {weight[i]:.>20d}")
     print("\nTotal MST: ", "\t", total)
 
-def minKey(g, key, mstSet):
-    """Find the node with the smallest key value that is not yet included in MST."""
+def minKey(g, key, mstSet, verbose=True):
+    """Find the node with the smallest key value that is not yet included in MST (printed unless verbose=False)."""
     min = sys.maxsize
     min_index = None
 
@@ -118,13 +205,19 @@ def minKey(g, key, mstSet):
             min_index = v
 
     # Print the selected node and its key value
-    if min_index is not None:
+    if min_index is not None and verbose:
         print(f'{min_index} is selected. Distance: {min}')
 
     return min_index
 
-def primMST(graph, s):
-    """Implement Prim's algorithm to find the MST of the graph."""
+def primMST(graph, s, queue="heap", verbose=True):
+    """Implement Prim's algorithm to find the MST of the graph.
+
+    With a priority queue ("heap", "dary", "pairing") only the edges of each
+    selected node are examined, O(E log V); "scan" uses minKey over all nodes.
+    Returns the (parent, key) maps: the MST edge of every node and its weight.
+    verbose=False skips the progress lines and the final printMST table.
+    """
     key = dict.fromkeys(graph.nodes, sys.maxsize)  # Key values used to pick minimum weight edge
     parent = dict.fromkeys(graph.nodes, None)  # Array to store the constructed MST
 
@@ -133,20 +226,128 @@ def primMST(graph, s):
 
     parent[s] = ""  # Root node of MST
 
+    pq = None if queue == "scan" else make_queue(queue)  # Candidate nodes keyed by edge weight
+    if pq is not None:
+        pq.push(s, 0)
+
     for aNode in graph.nodes:
-        u = minKey(graph, key, mstSet)  # Pick the minimum key vertex
+        if pq is None:
+            u = minKey(graph, key, mstSet, verbose)  # Pick the minimum key vertex
+        else:
+            u = None
+            while pq and u is None:
+                node, _ = pq.pop()
+                if not mstSet[node]:
+                    u = node
+            if u is not None and verbose:
+                print(f'{u} is selected. Distance: {key[u]}')
+
+        # Nodes left over are not connected to `s`
+        if u is None:
+            break
 
         mstSet[u] = True  # Mark the picked vertex as processed
 
         # Update key and parent for adjacent vertices
-        for v in graph.nodes:
-            if (graph.distances[(u, v)] > 0 and mstSet[v] == False and key[v] > graph.distances[(u,v)]):
-                key[v] = graph.distances[(u, v)]
+        for v, distance in graph.neighbors(u):
+            if (distance > 0 and mstSet[v] == False and key[v] > distance):
+                key[v] = distance
                 parent[v] = u
-    printMST(parent, graph)
+                if pq is not None:
+                    pq.push(v, distance)
+    if verbose:
+        printMST(parent, graph, key)
+    return parent, key
 
-def main():
-    """Main function to set up the graph and run Dijkstra's and Prim's algorithms."""
+# #########################
+#
+#  Minimum Spanning Tree (MST) - Kruskal's Algorithm
+#
+# #########################
+class UnionFind:
+    """Disjoint sets with path halving and union by size."""
+
+    def __init__(self, items=()):
+        self.parent = {}
+        self.size = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """Add `item` as a singleton set (no-op if it is already known)."""
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        """Return the representative of the set containing `item`."""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]  # Path halving
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merge the sets of `a` and `b`; return False if they were already joined."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+def kruskalMST(graph):
+    """Implement Kruskal's algorithm to find the MST (a forest if the graph is disconnected).
+
+    Edges are sorted once and joined with a union-find, O(E log E).
+    Returns the list of MST edges as (from_node, to_node, distance).
+    """
+    sets = UnionFind(graph.nodes)
+    edges = sorted(((u, v, distance) for u in graph.nodes for v, distance in graph.neighbors(u)),
+                   key=lambda edge: edge[2])
+    mst = []
+    for u, v, distance in edges:
+        sets.add(v)
+        if sets.union(u, v):
+            mst.append((u, v, distance))
+            if len(mst) == len(sets.parent) - 1:
+                break
+    return mst
+
+def printKruskal(mst):
+    """Print the edges chosen by Kruskal's algorithm and their total weight."""
+    print ("---------------------------------------------------------------")
+    print ("\tEdge\t\tWeight")
+    print ("---------------------------------------------------------------")
+    total = 0
+    for u, v, distance in mst:
+        total += distance
+        print(f"{u:>15} {v:>15} {distance:.>20d}")
+    print("\nTotal MST: ", "\t", total)
+
+# (latitude, longitude) of each city, for A* heuristics (see AStar.py)
+CITY_COORDINATES = {
+    'Atlanta': (33.7490, -84.3880),
+    'Boston': (42.3601, -71.0589),
+    'Chicago': (41.8781, -87.6298),
+    'Dallas': (32.7767, -96.7970),
+    'Denver': (39.7392, -104.9903),
+    'Houston': (29.7604, -95.3698),
+    'LA': (34.0522, -118.2437),
+    'Memphis': (35.1495, -90.0490),
+    'Miami': (25.7617, -80.1918),
+    'NY': (40.7128, -74.0060),
+    'Philadelphia': (39.9526, -75.1652),
+    'Phoenix': (33.4484, -112.0740),
+    'SF': (37.7749, -122.4194),
+    'Seattle': (47.6062, -122.3321),
+    'Washington': (38.9072, -77.0369),
+}
+
+def build_city_graph():
+    """Build the graph of the 15 cities and the roads between them."""
     g = Graph()  # Create a new graph object
 
     # Set up nodes (cities)
@@ -166,9 +367,6 @@ def main():
     g.add_node('Seattle')
     g.add_node('Washington')
 
-    # Initialize distances for Prim's algorithm
-    g.initializeDistances()
-
     # Set up distances (edges) between cities (roads and their distances)
     g.add_edge('Seattle', 'SF', 1092)
     g.add_edge('SF','Seattle',  1092)
@@ -230,12 +428,17 @@ def main():
     g.add_edge('Dallas', 'Washington', 1900)
     g.add_edge('Washington', 'Denver', 2395)
     g.add_edge('Denver', 'Washington', 2395)
+    return g
+
+def main():
+    """Main function to set up the graph and run Dijkstra's and Prim's algorithms."""
+    g = build_city_graph()
 
     # Run Dijkstra's algorithm
     print ("---------------------------------------------------------------")
     print("Dijkstra's Algorithm Results: ")
     print ("---------------------------------------------------------------")
-    dijkstra_city_distance(g, 'Denver')
+    dijkstra_city_distance(g, 'Denver', tracer=PathPrinter())
 
     # Run Prim's algorithm to find the MST
     print ("---------------------------------------------------------------")
@@ -243,5 +446,11 @@ def main():
     print ("---------------------------------------------------------------")
     primMST(g, 'Denver')
 
+    # Run Kruskal's algorithm on the same roads (should give the same total)
+    print ("---------------------------------------------------------------")
+    print("Kruskal's Algorithm Results: ")
+    print ("---------------------------------------------------------------")
+    printKruskal(kruskalMST(g))
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,165 @@
+import math
+from CSRGraph import CSRGraph
+from PriorityQueues import make_queue
+from SearchTracer import SearchStats
+from ShortestDistanceCity import build_city_graph
+
+# #########################
+#
+#  Point-to-point shortest path queries
+#
+# #########################
+# dijkstra / dijkstra_city_distance settle the whole graph. For a single
+# source -> target route we can stop as soon as the target is settled, or search
+# from both ends at once (bidirectional Dijkstra) over a reverse adjacency index.
+
+
+def reverse_index(graph):
+    """Build the reverse adjacency index (every edge flipped) used by the backward search.
+
+    Build it once and pass it as `reverse=` when running many queries on the same graph.
+    """
+    if isinstance(graph, CSRGraph):
+        return graph.reverse()
+    return CSRGraph.from_edges(((v, u, distance) for u in list(graph.edges) for v, distance in graph.neighbors(u)),
+                               graph.nodes)
+
+
+def build_path(pred, source, node):
+    """Walk the predecessor map back from `node` and return the node list from `source`."""
+    path = [node]
+    while node != source:
+        node = pred[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def shortest_path(graph, source, target, bidirectional=False, queue="heap", reverse=None, tracer=None):
+    """Return (distance, [source, ..., target]) for the shortest route, or (math.inf, []) if there is none.
+
+    The forward search stops once `target` is settled. With `bidirectional=True`
+    a backward search runs from `target` over `reverse` (see reverse_index) and
+    the two meet in the middle.
+    """
+    if source == target:
+        return 0, [source]
+    if bidirectional:
+        if reverse is None:
+            reverse = reverse_index(graph)
+        return _bidirectional(graph, reverse, source, target, queue, tracer)
+
+    dist = {source: 0}
+    pred = {}
+    settled = set()
+    pq = make_queue(queue)
+    pq.push(source, 0)
+    if tracer is not None:
+        tracer.on_start(source, dist, pred)
+        tracer.on_push(source, 0)
+
+    while pq:
+        u, d = pq.pop()
+        if tracer is not None:
+            tracer.on_pop(u, d)
+            tracer.on_settle(u, d)
+        settled.add(u)
+        # Early termination: the target's distance is final once it is popped
+        if u == target:
+            break
+        for v, distance in graph.neighbors(u):
+            if v in settled:
+                continue
+            weight = d + distance
+            if v not in dist or weight < dist[v]:
+                if tracer is not None:
+                    tracer.on_relax(u, v, dist.get(v), weight)
+                dist[v] = weight
+                pred[v] = u
+                pq.push(v, weight)
+                if tracer is not None:
+                    tracer.on_push(v, weight)
+            elif tracer is not None:
+                tracer.on_skip(u, v, dist[v])
+
+    if tracer is not None:
+        tracer.on_finish()
+    if target not in settled:
+        return math.inf, []
+    return dist[target], build_path(pred, source, target)
+
+
+def _bidirectional(graph, reverse, source, target, queue, tracer):
+    """Bidirectional Dijkstra: alternate forward and backward steps until the frontiers meet."""
+    # Index 0 is the forward search over `graph`, index 1 the backward search over `reverse`
+    graphs = (graph, reverse)
+    dist = ({source: 0}, {target: 0})
+    pred = ({}, {})
+    settled = (set(), set())
+    queues = (make_queue(queue), make_queue(queue))
+    queues[0].push(source, 0)
+    queues[1].push(target, 0)
+    best = math.inf  # Length of the best source -> target path seen so far
+    meet = None  # Node where that path crosses from one search to the other
+    if tracer is not None:
+        tracer.on_start(source, dist[0], pred[0])
+
+    while queues[0] and queues[1]:
+        # Stop once no path through the unsettled frontiers can beat `best`
+        if queues[0].peek()[1] + queues[1].peek()[1] >= best:
+            break
+        # Advance the side with the smaller frontier
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        other = 1 - side
+        u, d = queues[side].pop()
+        settled[side].add(u)
+        if tracer is not None:
+            tracer.on_pop(u, d)
+            tracer.on_settle(u, d)
+
+        for v, distance in graphs[side].neighbors(u):
+            if v in settled[side]:
+                continue
+            weight = d + distance
+            if v not in dist[side] or weight < dist[side][v]:
+                if tracer is not None:
+                    tracer.on_relax(u, v, dist[side].get(v), weight)
+                dist[side][v] = weight
+                pred[side][v] = u
+                queues[side].push(v, weight)
+                if tracer is not None:
+                    tracer.on_push(v, weight)
+            elif tracer is not None:
+                tracer.on_skip(u, v, dist[side][v])
+            # A node reached from both ends closes a candidate path
+            if v in dist[other] and dist[side][v] + dist[other][v] < best:
+                best = dist[side][v] + dist[other][v]
+                meet = v
+
+    if tracer is not None:
+        tracer.on_finish()
+    if meet is None:
+        return math.inf, []
+    # Forward half from the source, then follow the backward predecessors to the target
+    path = build_path(pred[0], source, meet)
+    node = meet
+    while node != target:
+        node = pred[1][node]
+        path.append(node)
+    return best, path
+
+
+def main():
+    """Answer a single city-to-city query both ways and compare the work done."""
+    g = build_city_graph()
+    reverse = reverse_index(g)
+    for bidirectional in (False, True):
+        stats = SearchStats()
+        distance, path = shortest_path(g, 'Denver', 'Boston', bidirectional=bidirectional,
+                                       reverse=reverse, tracer=stats)
+        print(f"{'Bidirectional' if bidirectional else 'Forward'} search: Denver to Boston = {distance} "
+              f"via {' to '.join(path)} ({stats.settled} nodes settled)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,176 @@
-from heapq import heappush, heappop, heapify
-from collections import defaultdict
+from collections import defaultdict, deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import io
 import math
 import os
+import struct
+import sys
+import time
+import zlib
+from itertools import islice
 from bitarray import bitarray
 
+try:
+    from bitarray import decodetree  # C prefix-code decoder (bitarray >= 1.0)
+except ImportError:
+    decodetree = None
+
+# Compressed file layout (all integers big-endian):
+#   header   magic "TZIP", format version, flags, original length (symbols),
+#            payload length in bits, number of symbols
+#   crc      CRC32 of the original data (only with FLAG_CRC)
+#   table    one (symbol, code length) pair per symbol; the codes themselves are
+#            the canonical Huffman codes for those lengths (see canonicalCode)
+#   payload  the encoded bits, padded with zeros to a whole byte
+MAGIC = b"TZIP"
+FORMAT_VERSION = 1
+FLAG_BYTES = 1  # Symbols are byte values and the output is binary (otherwise Unicode characters)
+FLAG_CRC = 2  # A CRC32 of the original data follows the header
+HEADER = struct.Struct(">4sBBQQI")
+CRC = struct.Struct(">I")
+SYMBOL = struct.Struct(">IB")  # Code point or byte value, code length
+
+# Large inputs are split into blocks of BLOCK_SIZE symbols, each stored as a
+# complete container with its own code table; a file is the blocks back to back,
+# followed by a block index so any block can be found without reading the others:
+#   index    magic "TZIX", then (block offset, symbols in block) per block
+#   footer   offset of the index, number of blocks, magic "TZIX"
+BLOCK_SIZE = 1 << 20
+INDEX_MAGIC = b"TZIX"
+INDEX_ENTRY = struct.Struct(">QQ")
+FOOTER = struct.Struct(">QI4s")
+
 # Function to generate Huffman codes based on character frequencies
 # Referenced module 18 slide 63
-def huffmanCode(freq_dict):
-    """Generate Huffman codes for the given frequency dictionary."""
-    # Create a heap with initial frequencies and empty codes
-    heap = [[freq, [char, ""]] for char, freq in freq_dict.items()]
-    heapify(heap)  # Turn the list into a min-heap
+def huffmanCode(freq_dict, max_length=None):
+    """Generate Huffman codes for the given frequency dictionary.
+
+    The codes are the canonical codes for huffmanLengths (or, with
+    `max_length`, limitedLengths). A single symbol gets the empty code.
+    """
+    if len(freq_dict) == 1:
+        return {char: "" for char in freq_dict}
+    if max_length is None:
+        lengths = huffmanLengths(freq_dict)
+    else:
+        lengths = limitedLengths(freq_dict, max_length)
+    return canonicalCode(lengths)
+
+# Function to compute Huffman code lengths with the two-queue method
+def huffmanLengths(freq_dict):
+    """Return {symbol: code length} of an optimal prefix code.
+
+    The leaves are sorted by frequency once (linear if they already are);
+    merged nodes come out in non-decreasing order, so a second FIFO queue
+    replaces the heap and the tree is built in linear time. The tree is kept as
+    a parent array and only the depths are read off it.
+    """
+    leaves = sorted(freq_dict.items(), key=lambda item: item[1])
+    n = len(leaves)
+    if n < 2:
+        return {char: 0 for char, _ in leaves}
+    weight = [freq for _, freq in leaves] + [0] * (n - 1)  # Leaves first, then merged nodes
+    parent = [0] * (2 * n - 1)
+    leaf = 0  # Next unused leaf
+    merged = n  # Next unused merged node; merged nodes are created at index `created`
+    for created in range(n, 2 * n - 1):
+        children = []
+        for _ in range(2):
+            # Take the lighter front of the two queues (leaves win ties, which keeps codes short)
+            if leaf < n and (merged == created or weight[leaf] <= weight[merged]):
+                children.append(leaf)
+                leaf += 1
+            else:
+                children.append(merged)
+                merged += 1
+        weight[created] = weight[children[0]] + weight[children[1]]
+        parent[children[0]] = parent[children[1]] = created
+
+    # Parents are created after their children, so one backward pass fills in every depth
+    depth = [0] * (2 * n - 1)
+    for node in range(2 * n - 3, -1, -1):
+        depth[node] = depth[parent[node]] + 1
+    return {char: depth[i] for i, (char, _) in enumerate(leaves)}
 
-    # Combine the two smallest nodes iteratively to build the Huffman Tree
-    while len(heap) > 1:
-        lo = heappop(heap)  # Pop the smallest node
-        hi = heappop(heap)  # Pop the next smallest node
+# Function to compute length-limited Huffman code lengths (package-merge)
+def limitedLengths(freq_dict, max_length):
+    """Return {symbol: code length} of the best prefix code with no code longer than `max_length`.
 
-        # Assign "0" to the left branch and "1" to the right branch
-        for pair in lo[1:]:
-            pair[1] = '0' + pair[1]
-        for pair in hi[1:]:
-            pair[1] = '1' + pair[1]
+    Package-merge: each of the `max_length` levels is the sorted leaves merged
+    with the pairs ("packages") of the level below. The first 2n - 2 items of
+    the top level are chosen; a leaf's code length is the number of levels in
+    which it is chosen. Runs in O(n * max_length).
+    """
+    leaves = sorted(freq_dict.items(), key=lambda item: item[1])
+    n = len(leaves)
+    if n < 2:
+        return {char: 0 for char, _ in leaves}
+    if (1 << max_length) < n:
+        raise ValueError(f"{n} symbols do not fit in codes of at most {max_length} bits")
 
-        # Push the combined node back into the heap
-        heappush(heap, [lo[0] + hi[0]] + lo[1:] + hi[1:])
+    # levels[k] lists the items of level k in order: a leaf index, or -1 for a package
+    levels = [list(range(n))]
+    weights = [freq for _, freq in leaves]
+    for _ in range(max_length - 1):
+        packages = [weights[i] + weights[i + 1] for i in range(0, len(weights) - 1, 2)]
+        items, merged = [], []
+        i = j = 0
+        while i < n or j < len(packages):
+            if j == len(packages) or (i < n and leaves[i][1] <= packages[j]):
+                items.append(i)
+                merged.append(leaves[i][1])
+                i += 1
+            else:
+                items.append(-1)
+                merged.append(packages[j])
+                j += 1
+        levels.append(items)
+        weights = merged
 
-    # Convert the result into a dictionary for easy look-up
-    return {char: code for char, code in heappop(heap)[1:]}
+    # Walk down from the top level: chosen packages choose twice as many items below
+    lengths = [0] * n
+    chosen = 2 * n - 2
+    for items in reversed(levels):
+        packages = 0
+        for item in items[:chosen]:
+            if item < 0:
+                packages += 1
+            else:
+                lengths[item] += 1
+        chosen = 2 * packages
+    return {char: lengths[i] for i, (char, _) in enumerate(leaves)}
 
 # Function to analyze a text file and calculate Huffman codes
-def huffmanTable():
-    """Analyze a text file, calculate Huffman codes, and display efficiency metrics."""
-    file = input("Enter a file name to encode: ").strip()
+def huffmanTable(file=None, verbose=True):
+    """Analyze a text file, calculate Huffman codes, and display efficiency metrics.
+
+    The file name is asked for interactively unless `file` is given;
+    verbose=False skips the printed table and metrics.
+    """
+    if file is None:
+        file = input("Enter a file name to encode: ").strip()
 
     # Check if the file exists
     if not os.path.isfile(file):
         print("File does not exist.")
         return None, None, None
 
-    # Read the file content
+    # Calculate character frequencies in one buffered pass over the file
+    freq_dict = Counter()
     with open(file, 'r') as inputFile:
-        text = inputFile.read()
+        for chunk in readBlocks(inputFile):
+            freq_dict.update(chunk)
+    text_length = sum(freq_dict.values())
 
     # Total number of bits in ASCII encoding
-    totalBits = len(text) * 8
-
-    # Calculate character frequencies
-    freq_dict = defaultdict(int)
-    for char in text:
-        freq_dict[char] += 1
+    totalBits = text_length * 8
 
     # Generate the Huffman codes
     huffTree = huffmanCode(freq_dict)
+    if not verbose:
+        return huffTree, text_length, os.path.splitext(file)[0]
 
     # Display the Huffman table
     print("-------------------------------------------------------------------------------")
@@ -77,72 +195,534 @@ def huffmanTable():
     print(f"Huffman efficiency improvement over ASCII code: {efficiencyImprovement:.2f}%")
 
     # Calculate the Fixed-Length Code (FCL) cost
-    FCLCost = len(text) * math.ceil(math.log2(len(freq_dict)))
+    FCLCost = text_length * math.ceil(math.log2(len(freq_dict)))
     print(f"Expected cost of optimal FCL cost: {FCLCost}")
 
     # Calculate Huffman efficiency improvement over FCL
     FCLImprovement = 100 - (100 * (huffCost / FCLCost))
     print(f"Huffman efficiency improvement over FCL: {FCLImprovement:.2f}%")
 
-    return huffTree, len(text), os.path.splitext(file)[0]
+    return huffTree, text_length, os.path.splitext(file)[0]
 
-# Function to compress a file using Huffman encoding
-def zip(input_file, output_file, huffman):
-    """Compress a text file using Huffman encoding."""
-    # Read the input file
-    with open(input_file, "r") as file:
-        text = file.read()
+# Function to read a file in blocks
+def readBlocks(file, block_size=BLOCK_SIZE):
+    """Yield successive chunks of at most `block_size` characters (or bytes) from an open file."""
+    while True:
+        chunk = file.read(block_size)
+        if not chunk:
+            return
+        yield chunk
+
+# Function to assign canonical Huffman codes from code lengths
+def canonicalCode(lengths):
+    """Return {symbol: code string} for {symbol: code length}.
+
+    Codes are handed out in order of (length, symbol), each one the previous
+    code plus one, shifted left whenever the length grows. Only the lengths have
+    to be stored to rebuild exactly the same codes.
+    """
+    codes = {}
+    code = 0
+    previous = 0
+    for symbol, length in sorted(lengths.items(), key=lambda item: (item[1], item[0])):
+        code <<= length - previous
+        codes[symbol] = format(code, f"0{length}b")
+        code += 1
+        previous = length
+    return codes
+
+# Function to pack data and its code table into the compressed container format
+def compressData(data, huffman=None, crc=True, encoder="bulk", max_length=None):
+    """Huffman-code `data` (str or bytes) and return the complete compressed file contents.
+
+    `huffman` may be any code for the symbols of `data` (e.g. from huffmanCode);
+    only its code lengths are kept, and the payload uses the canonical codes.
+    encoder="bulk" packs all the bits in one bitarray.encode call;
+    encoder="loop" extends the bitarray one character at a time. `max_length`
+    caps the code lengths when the code is built here (see limitedLengths).
+    """
+    binary = isinstance(data, (bytes, bytearray))
+    if huffman is None:
+        freq_dict = Counter(data)
+        huffman = huffmanCode(freq_dict, max_length) if freq_dict else {}
+    # A lone symbol gets the empty code; give it one bit so it can be stored
+    lengths = {char: max(1, len(code)) for char, code in huffman.items()}
+    codes = canonicalCode(lengths)
 
     # Create a bitarray for encoded text
     encoded_bits = bitarray()
-    # Encode the text using the Huffman codes
-    for char in text:
-        encoded_bits.extend(bitarray(huffman[char]))  # Extend the bitarray with Huffman codes
+    if encoder == "bulk" and data:
+        # Convert every code to a bitarray once, then encode the whole block in C
+        encoded_bits.encode({char: bitarray(code) for char, code in codes.items()}, data)
+    else:
+        # Encode the text using the Huffman codes
+        for char in data:
+            encoded_bits.extend(bitarray(codes[char]))  # Extend the bitarray with Huffman codes
+
+    flags = (FLAG_BYTES if binary else 0) | (FLAG_CRC if crc else 0)
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(data), len(encoded_bits), len(lengths))]
+    if crc:
+        parts.append(CRC.pack(zlib.crc32(data if binary else data.encode("utf-8"))))
+    for char, length in sorted(lengths.items()):
+        parts.append(SYMBOL.pack(char if binary else ord(char), length))
+    parts.append(encoded_bits.tobytes())
+    return b"".join(parts)
+
+# Function to unpack and decode compressed data held in memory
+def decompressData(blob):
+    """Decode the contents of a compressed file; returns str (or bytes for binary input)."""
+    blocks = list(decompressStream(io.BytesIO(blob)))
+    if not blocks:
+        raise ValueError("Not a TinyZip file (empty)")
+    return blocks[0][:0].join(blocks)
+
+# Function to run independent jobs in a process pool, in order
+def parallelMap(function, items, workers=1):
+    """Yield function(item) for every item, in order.
+
+    With more than one worker (None: one per CPU) the calls run in a process
+    pool; at most two jobs per worker are in flight, so a long input is never
+    read far ahead of the results being consumed.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for item in items:
+            yield function(item)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(function, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+# Function to compress a stream block by block
+def compressStream(source, huffman=None, block_size=BLOCK_SIZE, crc=True, encoder="bulk", workers=1,
+                   max_length=None):
+    """Yield one container per block of an open file (text or binary) or iterable of chunks.
+
+    Without `huffman`, every block gets its own code table built from that
+    block alone, so the input is read exactly once and only a few blocks are
+    in memory. Blocks are independent, so `workers` processes (None: one per
+    CPU) can code them in parallel. An empty input still yields one (empty) block.
+    """
+    chunks = readBlocks(source, block_size) if hasattr(source, "read") else iter(source)
+    encode = partial(compressData, huffman=huffman, crc=crc, encoder=encoder, max_length=max_length)
+    empty = True
+    for block in parallelMap(encode, chunks, workers):
+        empty = False
+        yield block
+    if empty:
+        binary = hasattr(source, "read") and not isinstance(source, io.TextIOBase)
+        yield compressData(b"" if binary else "", huffman, crc, encoder)
+
+# Function to read the next container from a compressed stream
+def readContainer(file):
+    """Return the bytes of the next container in an open binary file, or None at the end."""
+    header = file.read(HEADER.size)
+    if not header or header.startswith(INDEX_MAGIC):
+        return None  # End of the file, or the block index that follows the last block
+    if len(header) < HEADER.size:
+        raise ValueError("Truncated TinyZip header")
+    magic, _, flags, _, bit_length, symbols = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a TinyZip file (bad magic)")
+    size = (CRC.size if flags & FLAG_CRC else 0) + symbols * SYMBOL.size + (bit_length + 7) // 8
+    rest = file.read(size)
+    if len(rest) < size:
+        raise ValueError("Truncated TinyZip block")
+    return header + rest
+
+# Function to decompress a stream block by block
+def decompressStream(file, workers=1):
+    """Yield the decoded contents (str or bytes) of each container in an open binary file.
+
+    With `workers` > 1 (None: one per CPU) the blocks are decoded in parallel.
+    """
+    yield from parallelMap(decodeBlock, iter(lambda: readContainer(file), None), workers)
+
+# Function to pack the block index written after the last block
+def packIndex(entries, index_offset):
+    """Return the index and footer for [(block offset, symbols in block)] starting at `index_offset`."""
+    parts = [INDEX_MAGIC]
+    parts.extend(INDEX_ENTRY.pack(offset, symbols) for offset, symbols in entries)
+    parts.append(FOOTER.pack(index_offset, len(entries), INDEX_MAGIC))
+    return b"".join(parts)
+
+# Function to read the block index of a compressed file
+def readIndex(file):
+    """Return [(block offset, symbols in block)] from an open binary file, or None if it has no index."""
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    if size < FOOTER.size:
+        return None
+    file.seek(size - FOOTER.size)
+    index_offset, count, magic = FOOTER.unpack(file.read(FOOTER.size))
+    if magic != INDEX_MAGIC or index_offset + len(INDEX_MAGIC) + count * INDEX_ENTRY.size + FOOTER.size != size:
+        return None
+    file.seek(index_offset + len(INDEX_MAGIC))
+    raw = file.read(count * INDEX_ENTRY.size)
+    return [INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size) for i in range(count)]
+
+# Function to decode one block of a compressed file
+def readBlock(zip_file, number):
+    """Decode only block `number` of a compressed file (random access through the block index).
+
+    Block k holds the symbols after those of blocks 0..k-1; the index records
+    how many symbols each block holds.
+    """
+    with open(zip_file, "rb") as file:
+        index = readIndex(file)
+        if index is None:
+            raise ValueError(f"{zip_file} has no block index")
+        offset, _ = index[number]
+        file.seek(offset)
+        return decodeBlock(readContainer(file))
+
+# Function to unpack and decode a single container
+def decodeBlock(blob):
+    """Decode one container; returns str (or bytes for binary input)."""
+    magic, version, flags, length, bit_length, symbols = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a TinyZip file (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported TinyZip format version {version}")
+    binary = bool(flags & FLAG_BYTES)
+    offset = HEADER.size
+    checksum = None
+    if flags & FLAG_CRC:
+        checksum, = CRC.unpack_from(blob, offset)
+        offset += CRC.size
 
-    # Write the compressed data to the output file
-    with open(output_file, "wb") as output:
-        encoded_bits.tofile(output)  # Save the bitarray to the file
+    lengths = {}
+    for _ in range(symbols):
+        value, code_length = SYMBOL.unpack_from(blob, offset)
+        offset += SYMBOL.size
+        lengths[value if binary else chr(value)] = code_length
+    payload = blob[offset:offset + (bit_length + 7) // 8]
+
+    if length == 0:
+        data = b"" if binary else ""
+    else:
+        data = treeDecode(payload, canonicalCode(lengths), length, bit_length)
+    if len(data) != length:
+        raise ValueError(f"Truncated TinyZip file: decoded {len(data)} of {length} symbols")
+    if checksum is not None and zlib.crc32(data if binary else data.encode("utf-8")) != checksum:
+        raise ValueError("TinyZip CRC32 mismatch, the file is corrupt")
+    return data
+
+# Function to compress a file using Huffman encoding
+def zip(input_file, output_file, huffman=None, block_size=BLOCK_SIZE, binary=False, workers=1, verbose=True):
+    """Compress a text file using Huffman encoding.
+
+    The output is a self-contained file (header, code lengths, CRC32, payload),
+    so unzip does not need `huffman` or the original length. The input is
+    streamed in blocks of `block_size` characters, so memory use stays bounded;
+    `workers` processes (None: one per CPU) code the blocks in parallel.
+    With binary=True the file is coded byte by byte without decoding it as text
+    (any file type, restored byte for byte; `huffman` must then map byte values).
+    verbose=False skips the printed file sizes.
+    """
+    # Stream the input file through the encoder into the output file
+    entries = []
+    position = 0
+    with open(input_file, "rb" if binary else "r") as file, open(output_file, "wb") as output:
+        for block in compressStream(file, huffman, block_size, workers=workers):
+            output.write(block)
+            entries.append((position, HEADER.unpack_from(block)[3]))
+            position += len(block)
+        output.write(packIndex(entries, position))  # Block index for random access
 
     # Display file size statistics
+    if not verbose:
+        return
     print(f"The size of {input_file}: {os.stat(input_file).st_size} bytes")
     print(f"The size of {output_file}: {os.stat(output_file).st_size} bytes")
 
 
+# Function to time the bulk encoder against the per-character loop
+def benchmarkEncoder(input_file="King.txt", scale=100, repeat=3):
+    """Encode `input_file` repeated `scale` times with both encoders; returns a dict of timings.
+
+    Both the text and the raw bytes of the file are timed, best of `repeat` runs.
+    """
+    with open(input_file, "rb") as file:
+        raw = file.read() * scale
+    results = {"input_bytes": len(raw)}
+    for kind, data in (("text", raw.decode("utf-8")), ("bytes", raw)):
+        outputs = {}
+        for encoder in ("loop", "bulk"):
+            best = math.inf
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs[encoder] = compressData(data, encoder=encoder)
+                best = min(best, time.perf_counter() - started)
+            results[f"{kind}_{encoder}_MB_per_s"] = len(raw) / best / 1e6
+        if outputs["loop"] != outputs["bulk"]:
+            raise AssertionError("Encoders disagree")
+        results[f"{kind}_speedup"] = results[f"{kind}_bulk_MB_per_s"] / results[f"{kind}_loop_MB_per_s"]
+    return results
+
+# Function to build lookup tables for table-driven decoding
+def buildDecodeTable(huffman, bits=12):
+    """Build the lookup tables used by tableDecode for a prefix code {symbol: code string}.
+
+    Both tables are indexed by the next `bits` bits of input:
+      - `runs[i]` is (piece, length): every complete code that fits in those
+        bits, decoded in one step.
+      - `primary[i]` decodes one symbol as (length, piece). Codes longer than
+        `bits` share a slot per prefix holding (0, (extra, table)), a secondary
+        table indexed by the following `extra` bits.
+    A piece is a str for character symbols, bytes for byte values (0-255) and a
+    tuple otherwise. Returns (primary, runs, bits, longest code length, join).
+    """
+    if all(isinstance(char, str) for char in huffman):
+        piece, join = "".join, "".join
+    elif all(isinstance(char, int) and 0 <= char < 256 for char in huffman):
+        piece, join = bytes, b"".join
+    else:
+        piece, join = tuple, lambda pieces: [char for part in pieces for char in part]
+
+    longest = max((len(code) for code in huffman.values()), default=0)
+    bits = max(1, min(bits, max(longest, 8)))
+    primary = [None] * (1 << bits)
+
+    long_codes = defaultdict(list)  # prefix -> [(rest of code, symbol)]
+    for char, code in huffman.items():
+        if len(code) <= bits:
+            start = int(code, 2) << (bits - len(code)) if code else 0
+            for index in range(start, start + (1 << (bits - len(code)))):
+                primary[index] = (len(code), piece([char]))
+        else:
+            long_codes[int(code[:bits], 2)].append((code[bits:], char))
+
+    for prefix, rests in long_codes.items():
+        extra = max(len(rest) for rest, _ in rests)
+        table = [None] * (1 << extra)
+        for rest, char in rests:
+            start = int(rest, 2) << (extra - len(rest))
+            for index in range(start, start + (1 << (extra - len(rest)))):
+                table[index] = (bits + len(rest), piece([char]))
+        primary[prefix] = (0, (extra, table))
+
+    # Multi-symbol runs: keep decoding inside the same `bits`-bit window
+    runs = []
+    for index in range(1 << bits):
+        parts = []
+        used = 0
+        while True:
+            entry = primary[(index << used) & ((1 << bits) - 1)]
+            if entry is None or entry[0] == 0 or used + entry[0] > bits:
+                break
+            parts.append(entry[1])
+            used += entry[0]
+        runs.append((join(parts) if piece is not tuple else tuple(join(parts)), used))
+    return primary, runs, bits, longest, join
+
+# Function to decode a byte buffer with the lookup tables
+def tableDecode(data, table, count=None, bit_length=None):
+    """Decode Huffman-coded `data` (bytes, most significant bit first).
+
+    Stops after `count` symbols, or when fewer than `bit_length` (default: all)
+    bits remain for the next code, so padding is never decoded when either is known.
+    Returns a str for character symbols, bytes for byte values, otherwise a list.
+    """
+    primary, runs, bits, longest, join = table
+    mask = (1 << bits) - 1
+    total_bits = len(data) * 8 if bit_length is None else bit_length
+    limit = count if count is not None else total_bits  # Every code is at least one bit
+    pieces = []  # Decoded pieces, joined at the end
+    append = pieces.append
+
+    acc = 0  # Bit buffer; its low `nbits` bits are unread (higher bits are stale)
+    nbits = 0
+    position = 0  # Next byte of `data` to load
+    consumed = 0  # Bits decoded so far
+    produced = 0  # Symbols decoded so far
+    size = len(data)
+    window = max(bits, longest)
+
+    # Fast path: whole runs of symbols per lookup, while they cannot overshoot the end
+    fast_bits = total_bits - window
+    fast_count = limit - bits
+    while consumed <= fast_bits and produced <= fast_count:
+        if nbits < window:
+            chunk = data[position:position + 8]
+            acc = ((acc & ((1 << nbits) - 1)) << (8 * len(chunk))) | int.from_bytes(chunk, "big")
+            position += len(chunk)
+            nbits += 8 * len(chunk)
+        shift = nbits - bits
+        piece, length = runs[(acc >> shift) & mask]
+        if length == 0:
+            # The next code is longer than the window: go through the secondary table
+            entry = primary[(acc >> shift) & mask]
+            if entry is None:
+                raise ValueError(f"Invalid Huffman code at bit {consumed}")
+            extra, secondary = entry[1]
+            length, piece = secondary[(acc >> (shift - extra)) & ((1 << extra) - 1)]
+        append(piece)
+        produced += len(piece)
+        consumed += length
+        nbits -= length
+    acc &= (1 << nbits) - 1
+
+    # Careful path for the tail: one symbol at a time, checking the limits
+    while produced < limit:
+        while nbits < window and position < size:
+            acc = (acc << 8) | data[position]
+            position += 1
+            nbits += 8
+        index = (acc >> (nbits - bits)) & mask if nbits >= bits else (acc << (bits - nbits)) & mask
+        entry = primary[index]
+        if entry is not None and entry[0] == 0:
+            extra, secondary = entry[1]
+            need = bits + extra
+            index = (acc >> (nbits - need)) if nbits >= need else (acc << (need - nbits))
+            entry = secondary[index & ((1 << extra) - 1)]
+        if entry is None:
+            if consumed >= total_bits:
+                break
+            raise ValueError(f"Invalid Huffman code at bit {consumed}")
+        length, piece = entry
+        if consumed + length > total_bits:
+            break  # Only padding is left
+        consumed += length
+        nbits -= length
+        acc &= (1 << nbits) - 1
+        append(piece)
+        produced += 1
+    return join(pieces)
+
+# Function to decode a byte buffer with bitarray's C decoder
+def treeDecode(data, huffman, count=None, bit_length=None):
+    """Decode Huffman-coded `data` (bytes, most significant bit first) for {symbol: code string}.
+
+    The bits are cut to `bit_length` and decoding stops after `count` symbols,
+    all inside bitarray.decode with a decodetree. Returns the same types as
+    tableDecode, which is used instead when neither limit is known (the
+    padding could not be told apart from a code) or decodetree is missing.
+    """
+    if decodetree is None or (count is None and bit_length is None):
+        return tableDecode(data, buildDecodeTable(huffman), count, bit_length)
+    bits = bitarray()
+    bits.frombytes(data)
+    if bit_length is not None:
+        del bits[bit_length:]
+    symbols = bits.decode(decodetree({char: bitarray(code) for char, code in huffman.items()}))
+    if count is not None:
+        symbols = islice(symbols, count)
+    if all(isinstance(char, str) for char in huffman):
+        return "".join(symbols)
+    if all(isinstance(char, int) and 0 <= char < 256 for char in huffman):
+        return bytes(symbols)
+    return list(symbols)
+
 # Function to decompress a Huffman-encoded file
-def unzip(zip_file, huffman, text_length):
-    """Decompress a Huffman-encoded file."""
-    # Read the compressed file
+def unzip(zip_file, huffman=None, text_length=None, decoder="tree", workers=1, output_file=None, verbose=True):
+    """Decompress a Huffman-encoded file.
+
+    Files written by zip carry their own code table and length, and their
+    blocks can be decoded by `workers` processes (None: one per CPU). `huffman` and
+    `text_length` are only needed for older files that hold just the raw bits:
+    decoder="tree" decodes with bitarray's decodetree (treeDecode) and stops at
+    `text_length` characters, decoder="table" uses the pure-Python lookup
+    tables (tableDecode) and decoder="bitwise" walks the codes one bit at a time.
+    The output defaults to the zip file name with the extension ".unzipped.txt";
+    verbose=False skips the printed file size.
+    """
+    if output_file is None:
+        output_file = f"{os.path.splitext(zip_file)[0]}.unzipped.txt"
     with open(zip_file, "rb") as file:
+        if file.read(len(MAGIC)) == MAGIC:
+            # Decode block by block, writing each one out before reading the next
+            file.seek(0)
+            blocks = decompressStream(file, workers)
+            first = next(blocks)
+            with open(output_file, "wb" if isinstance(first, bytes) else "w") as output:
+                output.write(first)
+                for block in blocks:
+                    output.write(block)
+            if verbose:
+                print(f"The size of {output_file}: {os.stat(output_file).st_size} bytes")
+            return
+        # Read the compressed file
+        file.seek(0)
+        data = file.read()
+
+    if huffman is None:
+        raise ValueError(f"{zip_file} has no code table; pass the Huffman map used to compress it")
+    elif decoder in ("tree", "table"):
+        if len(huffman) == 1:
+            # A single symbol gets the empty code, so there are no bits to decode
+            decoded_text = [next(iter(huffman))] * (text_length or 0)
+        elif decoder == "tree":
+            decoded_text = treeDecode(data, huffman, text_length)
+        else:
+            decoded_text = tableDecode(data, buildDecodeTable(huffman), text_length)
+    else:
         encoded_bits = bitarray()
-        encoded_bits.fromfile(file)  # Load the bitarray from the file
+        encoded_bits.frombytes(data)  # Load the bitarray from the file
 
-    # Reverse the Huffman map for decoding
-    reverse_huffman = {code: char for char, code in huffman.items()}
+        # Reverse the Huffman map for decoding
+        reverse_huffman = {code: char for char, code in huffman.items()}
 
-    # Decode the bitarray back into the original text
-    decoded_text = []
-    code = ""
-    for bit in encoded_bits:
-        code += '1' if bit else '0'
-        if code in reverse_huffman:  # If a complete code is found
-            decoded_text.append(reverse_huffman[code])  # Add the corresponding character
-            code = ""  # Reset the code for the next character
+        # Decode the bitarray back into the original text
+        decoded_text = []
+        code = ""
+        for bit in encoded_bits:
+            code += '1' if bit else '0'
+            if code in reverse_huffman:  # If a complete code is found
+                decoded_text.append(reverse_huffman[code])  # Add the corresponding character
+                code = ""  # Reset the code for the next character
 
     # Write the decompressed text to a new file
-    output_file = f"{os.path.splitext(zip_file)[0]}.unzipped.txt"
     with open(output_file, "w") as file:
         file.write("".join(decoded_text))  # Save the decoded text to a file
 
     # Display the size of the decompressed file
-    print(f"The size of {output_file}: {os.stat(output_file).st_size} bytes")
+    if verbose:
+        print(f"The size of {output_file}: {os.stat(output_file).st_size} bytes")
 
 # Main function to run the Huffman encoding program
-def main():
-    """Main function to handle file compression and decompression."""
+def main(argv=None):
+    """Compress and decompress files from the command line.
+
+    Without arguments the original interactive flow runs: ask for a text
+    file, show its Huffman table, then zip and unzip it.
+    """
+    parser = argparse.ArgumentParser(description="Huffman coding file compressor.")
+    commands = parser.add_subparsers(dest="command")
+    table_parser = commands.add_parser("table", help="show the Huffman table and costs of a text file")
+    table_parser.add_argument("input")
+    zip_parser = commands.add_parser("zip", help="compress a file")
+    zip_parser.add_argument("input")
+    zip_parser.add_argument("output", nargs="?", help="default: the input name with the extension .zip")
+    zip_parser.add_argument("--binary", action="store_true", help="code raw bytes (any file type)")
+    zip_parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    zip_parser.add_argument("--workers", type=int, default=1, help="0: one per CPU")
+    unzip_parser = commands.add_parser("unzip", help="decompress a file written by zip")
+    unzip_parser.add_argument("input")
+    unzip_parser.add_argument("output", nargs="?", help="default: the input name with the extension .unzipped.txt")
+    unzip_parser.add_argument("--workers", type=int, default=1, help="0: one per CPU")
+    args = parser.parse_args(argv)
+
+    if args.command == "table":
+        return 0 if huffmanTable(args.input)[0] is not None else 1
+    if args.command == "zip":
+        output = args.output or f"{os.path.splitext(args.input)[0]}.zip"
+        zip(args.input, output, block_size=args.block_size, binary=args.binary, workers=args.workers or None)
+        return 0
+    if args.command == "unzip":
+        unzip(args.input, workers=args.workers or None, output_file=args.output)
+        return 0
+
     # Generate Huffman codes and analyze the file
     huffmanMap, text_length, file_base = huffmanTable()
     if not huffmanMap:
-        return  # If no Huffman map is returned, terminate
+        return 1  # If no Huffman map is returned, terminate
 
     # Define input and output file names
     input_file = f"{file_base}.txt"
@@ -151,9 +731,10 @@ def main():
     # Compress the input file
     zip(input_file, zip_file, huffmanMap)
 
-    # Decompress the compressed file
-    unzip(zip_file, huffmanMap, text_length)
+    # Decompress the compressed file (it carries its own code table)
+    unzip(zip_file)
+    return 0
 
 # Entry point of the script
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+import Dijkstra
+import ShortestDistanceCity
+from Dijkstra import dijkstra
+from DynamicSSSP import DynamicShortestPaths
+from ShortestDistanceCity import build_city_graph
+
+
+def random_graph(graph_class, nodes, edges, rng):
+    graph = graph_class()
+    for node in range(nodes):
+        graph.add_node(node)
+    for _ in range(edges):
+        u, v = rng.sample(range(nodes), 2)
+        graph.add_edge(u, v, rng.randint(1, 20))
+    return graph
+
+
+def random_batch(graph, nodes, size, rng):
+    """Mix of deletions (None), re-weights of existing edges and new edges."""
+    changes = []
+    existing = list(graph.distances)
+    for _ in range(size):
+        roll = rng.random()
+        if existing and roll < 0.3:
+            u, v = rng.choice(existing)
+            changes.append((u, v, None))
+        elif existing and roll < 0.7:
+            u, v = rng.choice(existing)
+            changes.append((u, v, rng.randint(1, 20)))
+        else:
+            u, v = rng.sample(range(nodes), 2)
+            changes.append((u, v, rng.randint(1, 20)))
+    return changes
+
+
+def assert_matches_recompute(tracker):
+    graph, source = tracker.graph, tracker.source
+    expected = dijkstra(graph, source)[0]
+    assert tracker.dist == expected
+    assert set(tracker.pred) == set(expected) - {source}
+    for v, u in tracker.pred.items():
+        # Every predecessor edge exists and lies on a shortest path
+        assert (u, v) in graph.distances
+        assert tracker.dist[u] + graph.distances[(u, v)] == tracker.dist[v]
+
+
+@pytest.mark.parametrize("graph_class", [Dijkstra.Graph, ShortestDistanceCity.Graph])
+@pytest.mark.parametrize("seed", range(5))
+def test_random_batches_match_full_recompute(graph_class, seed):
+    rng = random.Random(seed)
+    nodes = 40
+    graph = random_graph(graph_class, nodes, 120, rng)
+    tracker = DynamicShortestPaths(graph, 0)
+    assert_matches_recompute(tracker)
+    for _ in range(25):
+        tracker.apply(random_batch(graph, nodes, rng.randint(1, 8), rng))
+        assert_matches_recompute(tracker)
+
+
+def test_city_graph_updates():
+    graph = build_city_graph()
+    tracker = DynamicShortestPaths(graph, 'Denver')
+    rng = random.Random(3412)
+    for _ in range(20):
+        roads = list(graph.distances)
+        changes = []
+        for u, v in rng.sample(roads, 4):
+            if rng.random() < 0.2:
+                changes.append((u, v, None))
+            else:
+                changes.append((u, v, max(1, int(graph.distances[(u, v)] * rng.uniform(0.5, 1.5)))))
+        tracker.apply(changes)
+        assert_matches_recompute(tracker)
+
+
+def test_returns_changed_nodes():
+    graph = Dijkstra.Graph()
+    graph.add_edges([('s', 'a', 1), ('a', 'b', 1), ('s', 'b', 5)])
+    tracker = DynamicShortestPaths(graph, 's')
+    assert tracker.apply([('a', 'b', None)]) == {'b'}
+    assert tracker.dist == {'s': 0, 'a': 1, 'b': 5}
+    assert tracker.apply([('s', 'b', 5)]) == set()
+    assert tracker.apply([('s', 'a', None)]) == {'a'}
+    assert 'a' not in tracker.dist and 'a' not in tracker.pred
@@ -0,0 +1,23 @@
+import pytest
+
+from GraphLoader import read_csv_edges
+
+
+def test_header_after_comments_is_skipped(tmp_path):
+    path = tmp_path / "roads.csv"
+    path.write_text("# exported roads\n\nfrom,to,w\na,b,3\nb,c,2.5\n")
+    assert list(read_csv_edges(str(path))) == [("a", "b", 3), ("b", "c", 2.5)]
+
+
+def test_only_the_first_data_row_may_be_a_header(tmp_path):
+    path = tmp_path / "roads.csv"
+    path.write_text("# exported roads\nfrom,to,w\na,b,3\n# note\nb,c,far\n")
+    with pytest.raises(ValueError, match=r"roads.csv:5: bad distance 'far'"):
+        list(read_csv_edges(str(path)))
+
+
+def test_bad_distance_after_the_first_data_row_is_an_error(tmp_path):
+    path = tmp_path / "roads.tsv"
+    path.write_text("a\tb\t3\nb\tc\tx\n")
+    with pytest.raises(ValueError, match=r":2: bad distance 'x'"):
+        list(read_csv_edges(str(path)))
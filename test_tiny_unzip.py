@@ -0,0 +1,84 @@
+import random
+from collections import Counter
+
+import pytest
+from bitarray import bitarray
+
+import TinyUnzip
+from TinyUnzip import huffmanTable, main, unzip, zip
+
+
+@pytest.fixture
+def text_file(tmp_path):
+    path = tmp_path / "sample.txt"
+    path.write_text("the quick brown fox jumps over the lazy dog\n" * 200)
+    return path
+
+
+def test_zip_and_unzip_are_silent_when_not_verbose(text_file, tmp_path, capsys):
+    zip_file = tmp_path / "sample.tz"
+    output = tmp_path / "sample.out"
+    zip(str(text_file), str(zip_file), verbose=False)
+    unzip(str(zip_file), output_file=str(output), verbose=False)
+    assert capsys.readouterr().out == ""
+    assert output.read_text() == text_file.read_text()
+
+
+def test_unzip_prints_the_output_size_by_default(text_file, tmp_path, capsys):
+    zip_file = tmp_path / "sample.tz"
+    zip(str(text_file), str(zip_file), verbose=False)
+    unzip(str(zip_file))
+    assert "sample.unzipped.txt" in capsys.readouterr().out
+    assert (tmp_path / "sample.unzipped.txt").read_text() == text_file.read_text()
+
+
+def test_legacy_raw_file_is_silent_when_not_verbose(tmp_path, capsys):
+    text = "abracadabra" * 50
+    huffman = TinyUnzip.huffmanCode(Counter(text))
+    bits = bitarray()
+    bits.encode({char: bitarray(code) for char, code in huffman.items()}, text)
+    raw = tmp_path / "raw.bin"
+    raw.write_bytes(bits.tobytes())
+    for decoder in ("tree", "table", "bitwise"):
+        output = tmp_path / f"raw.{decoder}.txt"
+        unzip(str(raw), huffman, len(text), decoder=decoder, output_file=str(output), verbose=False)
+        # The bitwise loop has no length limit and may decode the padding too
+        assert output.read_text().startswith(text)
+    assert capsys.readouterr().out == ""
+
+
+def test_huffman_table_without_prompt(text_file, capsys):
+    huffman, length, base = huffmanTable(str(text_file), verbose=False)
+    assert capsys.readouterr().out == ""
+    assert length == len(text_file.read_text())
+    assert set(huffman) == set(text_file.read_text())
+    assert base == str(text_file)[:-len(".txt")]
+
+
+def test_command_line_round_trip(tmp_path, capsys):
+    data = random.Random(0).randbytes(50_000)
+    source = tmp_path / "data.bin"
+    source.write_bytes(data)
+    assert main(["zip", str(source), str(tmp_path / "data.tz"), "--binary", "--block-size", "4096"]) == 0
+    assert main(["unzip", str(tmp_path / "data.tz"), str(tmp_path / "data.out")]) == 0
+    assert (tmp_path / "data.out").read_bytes() == data
+    assert main(["table", str(tmp_path / "missing.txt")]) == 1
+
+
+@pytest.mark.parametrize("payload", ["", "a", "aaaa", "héllo wörld €" * 50, bytes(range(256)) * 3, b"\0" * 9])
+def test_containers_round_trip(payload):
+    assert TinyUnzip.decompressData(TinyUnzip.compressData(payload)) == payload
+
+
+@pytest.mark.parametrize("payload", ["a" * 1000, b"\0" * 1000])
+def test_codec_benchmark_handles_a_single_symbol(tmp_path, payload):
+    from CodecBenchmark import run_stages
+    binary = isinstance(payload, bytes)
+    path = tmp_path / "one.bin"
+    if binary:
+        path.write_bytes(payload)
+    else:
+        path.write_text(payload)
+    stages, facts = run_stages(str(path), binary)
+    assert set(stages) == {"count", "table", "encode", "decode"}
+    assert facts["distinct"] == 1 and facts["symbols"] == 1000